@@ -1,13 +1,23 @@
+import json
+import time
+RUN_START = time.perf_counter()
+
 import streamlit as st
 import pandas as pd
-import json
-import os
-from datetime import datetime
 import plotly.express as px
 
-# --- UVOZ TRANSFORMERS & WORDCLOUD (ZA BONUS) ---
-from transformers import pipeline
-from wordcloud import WordCloud
+import paths
+import loader
+import metrics
+import rollups
+import search
+import sentiment
+import storage
+import wordcloud_index
+
+# transformers, wordcloud in matplotlib se uvozijo šele ob prvi uporabi
+# (model v ozadju, word cloud na strani Reviews)
+IMPORT_SECONDS = time.perf_counter() - RUN_START
 
 
 # ==========================================
@@ -40,73 +50,72 @@ st.markdown("""
 # ==========================================
 # LOAD DATA
 # ==========================================
-@st.cache_data
-def load_data():
-    """Naloži scraped podatke iz JSON datotek"""
-    # Za Render deployment moramo preveriti, kje so datoteke.
-    # Predvidevamo, da so naložene v isti mapi ali podmapi.
-    data_folder = 'scraped_data' 
-    
-    # Če mape ni (na Renderju včasih), preveri trenutno mapo
-    if not os.path.exists(data_folder):
-        data_folder = '.'
-
-    try:
-        # Prilagoditev poti za GitHub/Render strukturo
-        p_path = os.path.join(data_folder, 'products.json')
-        r_path = os.path.join(data_folder, 'reviews.json')
-        t_path = os.path.join(data_folder, 'testimonials.json')
-
-        # Če datotek ni v mapi, poskusi direktno (fallback)
-        if not os.path.exists(p_path): p_path = 'products.json'
-        if not os.path.exists(r_path): r_path = 'reviews.json'
-        if not os.path.exists(t_path): t_path = 'testimonials.json'
-
-        with open(p_path, 'r', encoding='utf-8') as f: products = json.load(f)
-        with open(r_path, 'r', encoding='utf-8') as f: reviews = json.load(f)
-        with open(t_path, 'r', encoding='utf-8') as f: testimonials = json.load(f)
-        
-        # Parse datume v reviews
-        for review in reviews:
-            try:
-                date_str = review.get('date', '')
-                for fmt in ['%B %d, %Y', '%b %d, %Y', '%Y-%m-%d', '%d.%m.%Y']:
-                    try:
-                        parsed_date = datetime.strptime(date_str, fmt)
-                        review['date_parsed'] = parsed_date
-                        review['month'] = parsed_date.month
-                        review['year'] = parsed_date.year
-                        review['month_name'] = parsed_date.strftime('%B')
-                        break
-                    except:
-                        continue
-                if 'date_parsed' not in review:
-                    review['date_parsed'] = datetime(2023, 6, 1)
-                    review['month'] = 6
-                    review['year'] = 2023
-                    review['month_name'] = 'June'
-            except:
-                review['date_parsed'] = datetime(2023, 6, 1)
-                review['month'] = 6
-                review['year'] = 2023
-                review['month_name'] = 'June'
-        
-        return {'products': products, 'reviews': reviews, 'testimonials': testimonials}
+@st.cache_resource
+def open_storage():
+    """SQLite baza scraped podatkov - ena povezava za ves proces.
     
-    except Exception as e:
-        # Če napaka, vrni prazne strukture, da app ne crashne takoj
-        return {'products': [], 'reviews': [], 'testimonials': []}
+    Strani z indeksiranimi poizvedbami berejo samo vrstice, ki ustrezajo
+    filtru, zato poraba pomnilnika ni odvisna od velikosti podatkov.
+    """
+    return storage.Storage.open(paths.find_data_folder())
 
-data = load_data()
+@st.cache_resource(max_entries=1)
+def sync_storage(version):
+    """Ob novi verziji (časi sprememb datotek) uvozi spremenjene poglede v isto bazo"""
+    db = open_storage()
+    db.sync_views(paths.find_data_folder())
+    return db
+
+@st.cache_resource
+def startup_timings():
+    """Časi prvega (hladnega) zagona procesa - skupni za vse seje"""
+    return {}
+
+@st.cache_resource
+def dashboard_metrics():
+    """Faze dashboarda (nalaganje, filtri, inferenca, grafi) za vse seje; METRICS_PROFILE za cProfile"""
+    return metrics.Metrics("dashboard")
+
+app_metrics = dashboard_metrics()
+
+data_start = time.perf_counter()
+data_version = paths.data_version()
+with app_metrics.span("data_load"):
+    db = sync_storage(data_version)
+startup = startup_timings()
+startup.setdefault("imports", IMPORT_SECONDS)
+startup.setdefault("data", time.perf_counter() - data_start)
 
 # ==========================================
 # --- LOAD AI MODEL ---
 # ==========================================
 @st.cache_resource
-def load_sentiment_model():
-    """Naloži Hugging Face pipeline (samo enkrat)"""
+def model_warmup():
+    """Začne nalagati sentiment model v ozadju (samo enkrat); backend izbere SENTIMENT_BACKEND"""
     # Uporaba manjšega modela za hitrejši load na Renderju
-    return pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english")
+    return sentiment.ModelWarmup(sentiment.BACKEND)
+
+# Ob zagonu aplikacije - do prvega obiska Reviews je model že naložen
+model_warmup()
+
+@st.cache_resource
+def load_sentiment_cache():
+    """Trajni cache rezultatov sentimenta (preživi restart aplikacije)"""
+    return sentiment.SentimentCache(sentiment.cache_path(), model_id=sentiment.model_key(sentiment.BACKEND))
+
+@st.cache_resource(max_entries=1)
+def load_wordcloud_cache(version):
+    """Frekvence besed po mesecih (enkrat na verzijo) + omejen cache PNG word cloudov"""
+    return wordcloud_index.WordCloudCache(wordcloud_index.WordIndex.from_texts(db.iter_review_texts()))
+
+@st.cache_resource(max_entries=1)
+def load_product_index(version):
+    """Indeks besednjaka za tipkarske napake (samo, ko SQL iskanje nima zadetkov).
+    
+    Imena bere iz products.arrow prek memory mapa (JSON, če ga ni).
+    """
+    products = loader.read_section(paths.find_data_folder(), 'products')
+    return products, search.ProductIndex.from_frame(products)
 
 # ==========================================
 # HELPER FUNCTIONS
@@ -114,6 +123,28 @@ def load_sentiment_model():
 def display_stars(rating):
     return "⭐" * int(rating)
 
+PAGE_SIZES = [10, 25, 50, 100]
+TABLE_VIEW_FROM = 200   # od toliko zadetkov naprej je privzeta tabela
+MAX_PRODUCT_ROWS = 1000
+
+@st.cache_data(max_entries=64)
+def rating_histogram(version, section, ratings=None):
+    """{ocena: število} za izbrane ocene (GROUP BY po indeksu, cache na filter)"""
+    return db.rating_histogram(section, ratings)
+
+@st.cache_data(max_entries=1)
+def section_counts(version):
+    return db.counts()
+
+# Rollupi obdobja se izračunajo enkrat na različico podatkov (nova različica = nov ključ)
+@st.cache_data(max_entries=64)
+def sentiment_rollup(version, start, end):
+    return db.sentiment_summary(start, end)
+
+@st.cache_data(max_entries=64)
+def monthly_rollup(version, start, end):
+    return db.monthly_summary(start, end)
+
 # ==========================================
 # SIDEBAR NAVIGATION
 # ==========================================
@@ -130,23 +161,41 @@ st.sidebar.info("**Podatki:** Leto 2023\n**Vir:** web-scraping.dev")
 if page == "🏠 Home":
     st.title("🛍️ E-Commerce Dashboard")
     st.markdown("### Dobrodošli v analitičnem dashboardu")
+    counts = section_counts(data_version)
     col1, col2, col3 = st.columns(3)
-    col1.metric("📦 Products", len(data['products']))
-    col2.metric("⭐ Reviews", len(data['reviews']))
-    col3.metric("💬 Testimonials", len(data['testimonials']))
+    col1.metric("📦 Products", counts['products'])
+    col2.metric("⭐ Reviews", counts['reviews'])
+    col3.metric("💬 Testimonials", counts['testimonials'])
 
 # ==========================================
 # PAGE: PRODUCTS
 # ==========================================
 elif page == "📦 Products":
     st.title("📦 Products")
-    if data['products']:
-        df_products = pd.DataFrame(data['products'])
-        st.metric("Skupaj produktov", len(df_products))
+    product_count = section_counts(data_version)['products']
+    if product_count:
+        st.metric("Skupaj produktov", product_count)
+        
+        col1, col2 = st.columns([2, 1])
+        search_term = col1.text_input("🔍 Iskanje produkta:", "", help="Predpona, del besede ali s tipkarsko napako")
+        price_range = db.price_range()
+        min_price = max_price = None
+        if price_range and price_range[0] < price_range[1]:
+            min_price, max_price = col2.slider("💶 Cena:", price_range[0], price_range[1], price_range)
+            if (min_price, max_price) == price_range:
+                min_price = max_price = None
         
-        search_term = st.text_input("🔍 Iskanje produkta:", "")
-        if search_term:
-            df_products = df_products[df_products['name'].str.contains(search_term, case=False, na=False)]
+        # FTS (trigrami) za podnize in indeks cene; vrne samo zadetke
+        with app_metrics.span("filter", page="products"):
+            df_products = db.search_products(search_term, min_price, max_price, limit=MAX_PRODUCT_ROWS)
+            if search_term and df_products.empty:
+                # Brez zadetkov: poskusi s tipkarskimi napakami
+                products, product_index = load_product_index(data_version)
+                df_products = products.iloc[product_index.search(search_term, min_price, max_price, MAX_PRODUCT_ROWS)]
+        if search_term or min_price is not None:
+            st.caption(f"Zadetkov: {len(df_products)}")
+        if len(df_products) == MAX_PRODUCT_ROWS:
+            st.caption(f"Prikazanih je prvih {MAX_PRODUCT_ROWS} - zoži iskanje.")
         
         st.dataframe(df_products, use_container_width=True)
         csv = df_products.to_csv(index=False).encode('utf-8')
@@ -157,90 +206,149 @@ elif page == "📦 Products":
 # ==========================================
 elif page == "💬 Testimonials":
     st.title("💬 Testimonials")
-    if data['testimonials']:
-        df_testimonials = pd.DataFrame(data['testimonials'])
+    all_ratings = rating_histogram(data_version, "testimonials")
+    if all_ratings:
+        ratings = [r for r in all_ratings if r is not None]
+        rated = sum(all_ratings[r] for r in ratings)
         col1, col2 = st.columns(2)
-        col1.metric("Skupaj", len(df_testimonials))
-        col2.metric("Povprečna ocena", f"{df_testimonials['rating'].mean():.2f} ⭐")
+        col1.metric("Skupaj", sum(all_ratings.values()))
+        col2.metric("Povprečna ocena", f"{sum(r * all_ratings[r] for r in ratings) / max(rated, 1):.2f} ⭐")
+        
+        rating_filter = st.multiselect("Filtriraj po oceni:", ratings, default=ratings)
+        with app_metrics.span("filter", page="testimonials"):
+            histogram = rating_histogram(data_version, "testimonials", tuple(sorted(rating_filter)))
+        matches = sum(histogram.values())
         
-        rating_filter = st.multiselect("Filtriraj po oceni:", sorted(df_testimonials['rating'].unique()), default=sorted(df_testimonials['rating'].unique()))
-        df_filtered = df_testimonials[df_testimonials['rating'].isin(rating_filter)]
+        # Izriše se samo ena stran zadetkov, ne glede na velikost podatkov
+        col1, col2, col3 = st.columns(3)
+        view = col1.radio("Prikaz:", ["Kartice", "Tabela"], horizontal=True,
+                          index=1 if matches >= TABLE_VIEW_FROM else 0)
+        page_size = col2.selectbox("Na stran:", PAGE_SIZES, index=1)
+        page_count = max(1, -(-matches // page_size))
+        page_number = col3.number_input(f"Stran (od {page_count}):", min_value=1, max_value=page_count, value=1,
+                                      key=f"testimonials_page_{page_size}_{matches}")  # nov filter -> stran 1
         
-        for idx, row in df_filtered.iterrows():
-            with st.container():
-                st.markdown(f"**Testimonial #{idx+1}** ({display_stars(row['rating'])})")
-                st.write(row['text'])
-                st.markdown("---")
+        # Samo vrstice strani (LIMIT/OFFSET po indeksu na rating)
+        first = (page_number - 1) * page_size
+        df_page = db.testimonials_page(rating_filter, page_size, first)
+        st.caption(f"Prikazano {first + 1 if len(df_page) else 0}-{first + len(df_page)} od {matches}")
+        
+        if view == "Tabela":
+            st.dataframe(
+                df_page[['text', 'rating']],
+                use_container_width=True,
+                column_config={"rating": st.column_config.NumberColumn("Ocena", format="%d ⭐")}
+            )
+        else:
+            for _, row in df_page.iterrows():
+                with st.container():
+                    st.markdown(f"**Testimonial #{row['id']}** ({display_stars(row['rating'])})")
+                    st.write(row['text'])
+                    st.markdown("---")
         
-        fig = px.bar(df_filtered['rating'].value_counts().sort_index(), title='Porazdelitev ocen')
-        st.plotly_chart(fig, use_container_width=True)
+        with app_metrics.span("chart", chart="ratings"):
+            fig = px.bar(pd.Series(histogram, name='count').rename_axis('rating'), title='Porazdelitev ocen')
+            st.plotly_chart(fig, use_container_width=True)
 
 # ==========================================
 # PAGE: REVIEWS (AI + WORDCLOUD BONUS)
 # ==========================================
 elif page == "⭐ Reviews":
     st.title("⭐ Reviews - AI Sentiment Analiza")
-    st.markdown("### Filtriraj reviews po mesecu (2023) in analiziraj z AI")
+    st.markdown("### Filtriraj reviews po obdobju in analiziraj z AI")
     
-    if data['reviews']:
-        df_reviews = pd.DataFrame(data['reviews'])
+    months = db.review_months()
+    if months:
+        labels = [rollups.month_label(y, m) for y, m in months]
+        default = "June 2023" if "June 2023" in labels else labels[-1]
+        if len(labels) > 1:
+            first_label, last_label = st.select_slider("Izberi mesec ali obdobje:", options=labels, value=(default, default))
+        else:
+            first_label = last_label = labels[0]
+        first_month, last_month = months[labels.index(first_label)], months[labels.index(last_label)]
+        start, _ = rollups.month_bounds(*first_month)
+        _, end = rollups.month_bounds(*last_month)
+        selected_period = first_label if first_label == last_label else f"{first_label} - {last_label}"
         
-        months_2023 = ["January 2023", "February 2023", "March 2023", "April 2023", "May 2023", "June 2023", "July 2023", "August 2023", "September 2023", "October 2023", "November 2023", "December 2023"]
-        selected_month = st.select_slider("Izberi mesec:", options=months_2023, value="June 2023")
-        month_number = months_2023.index(selected_month) + 1
+        if st.checkbox("📅 Poljubni datumi"):
+            first_day, last_day = (pd.Timestamp(d).date() for d in db.date_bounds())
+            value = (max(start.date(), first_day), min((end - pd.Timedelta(days=1)).date(), last_day))
+            picked = st.date_input("Od - do:", value=value, min_value=first_day, max_value=last_day)
+            if len(picked) == 2:
+                start, end = pd.Timestamp(picked[0]), pd.Timestamp(picked[1]) + pd.Timedelta(days=1)
+                selected_period = f"{picked[0]:%d.%m.%Y} - {picked[1]:%d.%m.%Y}"
         
-        filtered_reviews = df_reviews[(df_reviews['month'] == month_number) & (df_reviews['year'] == 2023)].copy()
+        # Obseg po indeksu reviews_date; neprebrani datumi (NULL) niso v nobenem obdobju
+        with app_metrics.span("filter", page="reviews"):
+            filtered_reviews = db.reviews_between(start, end)
         
         st.write(f"Najdenih mnenj: **{len(filtered_reviews)}**")
+        unparsed_dates = db.unparsed_dates()
+        if unparsed_dates:
+            st.caption(f"⚠️ {unparsed_dates} mnenj ima neprepoznan datum in niso prikazana.")
         
         if len(filtered_reviews) > 0:
             st.markdown("---")
-            with st.spinner("🤖 AI analizira sentiment..."):
-                sentiment_pipeline = load_sentiment_model()
-                texts = filtered_reviews['review_text'].astype(str).tolist()
-                results = sentiment_pipeline(texts)
-                
-                filtered_reviews['AI Sentiment'] = [r['label'] for r in results]
-                filtered_reviews['AI Confidence'] = [r['score'] for r in results]
-            
-            st.success("Analiza končana! ✅")
+            # Oznake so običajno predizračunane (python sentiment.py); live samo manjkajoče
+            warmup = model_warmup()
+            missing = sentiment.missing_sentiment(filtered_reviews)
+            if not missing.any():
+                st.success("Analiza končana! ✅")
+            elif warmup.ready:
+                with st.spinner("🤖 AI analizira sentiment..."), app_metrics.span("inference"):
+                    # Model se kliče samo za besedila, ki jih še ni v cacheu
+                    analyzed = sentiment.fill_sentiment(filtered_reviews, warmup.get, load_sentiment_cache())
+                app_metrics.inc("analyzed_reviews_total", analyzed)
+                st.success("Analiza končana! ✅")
+            elif warmup.state == "failed":
+                st.error(f"❌ AI modela ni bilo mogoče naložiti: {warmup.error}")
+            else:
+                # Stran se izriše s predizračunanimi oznakami, manjkajoče pridejo ob osvežitvi
+                st.info(f"⏳ AI model se nalaga v ozadju ({warmup.elapsed():.0f}s) - "
+                        "prikazane so samo predizračunane ocene.")
+                st.button("🔄 Osveži")
 
             # --- 4. VISUALIZATION (BAR CHART) ---
-            st.subheader(f"📊 Sentiment Analiza za {selected_month}")
+            st.subheader(f"📊 Sentiment Analiza za {selected_period}")
             
-            chart_data = filtered_reviews.groupby('AI Sentiment').agg(
-                Count=('AI Sentiment', 'count'),
-                Avg_Confidence=('AI Confidence', 'mean')
-            ).reset_index()
-
-            fig_bar = px.bar(
-                chart_data,
-                x='AI Sentiment',
-                y='Count',
-                color='AI Sentiment',
-                title="Število Positive/Negative ocen (z Avg Confidence)",
-                color_discrete_map={'POSITIVE': '#4CAF50', 'NEGATIVE': '#F44336'},
-                text='Count',
-                hover_data={'AI Sentiment': False, 'Count': True, 'Avg_Confidence': ':.2%'}
-            )
-            fig_bar.update_traces(hovertemplate="<b>%{x}</b><br>Število: %{y}<br>Avg Confidence: %{customdata[0]:.2%}<extra></extra>")
-            st.plotly_chart(fig_bar, use_container_width=True)
+            # Predizračunane oznake z GROUP BY v bazi + live oznake iz vrstic
+            chart_data = rollups.combine_sentiment([
+                sentiment_rollup(data_version, start, end),
+                rollups.sentiment_counts(filtered_reviews[missing])
+            ])
+
+            with app_metrics.span("chart", chart="sentiment"):
+                fig_bar = px.bar(
+                    chart_data,
+                    x='AI Sentiment',
+                    y='Count',
+                    color='AI Sentiment',
+                    title="Število Positive/Negative ocen (z Avg Confidence)",
+                    color_discrete_map={'POSITIVE': '#4CAF50', 'NEGATIVE': '#F44336'},
+                    text='Count',
+                    hover_data={'AI Sentiment': False, 'Count': True, 'Avg_Confidence': ':.2%'}
+                )
+                fig_bar.update_traces(hovertemplate="<b>%{x}</b><br>Število: %{y}<br>Avg Confidence: %{customdata[0]:.2%}<extra></extra>")
+                st.plotly_chart(fig_bar, use_container_width=True)
+
+            monthly = monthly_rollup(data_version, start, end)
+            if len(monthly) > 1:
+                with app_metrics.span("chart", chart="months"):
+                    fig_months = px.bar(monthly, x='Month', y='Count', title="Število mnenj po mesecih",
+                                        hover_data={'Avg_Rating': ':.2f'})
+                    st.plotly_chart(fig_months, use_container_width=True)
 
             # --- BONUS: WORD CLOUD ---
             st.subheader("☁️ Word Cloud (Bonus)")
-            st.write(f"Najpogostejše besede v mesecu {selected_month}")
+            st.write(f"Najpogostejše besede v obdobju {selected_period}")
             
-            # Združi ves tekst v en string
-            all_text = " ".join(review for review in filtered_reviews['review_text'])
-            
-            # Generiraj WordCloud
-            wordcloud = WordCloud(width=800, height=400, background_color='white').generate(all_text)
-            
-            # Prikaži z matplotlib
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.imshow(wordcloud, interpolation='bilinear')
-            ax.axis("off")
-            st.pyplot(fig)
+            # Predizračunane frekvence mesecev -> PNG iz cachea (izris samo prvič)
+            first_key = (start.year, start.month)
+            last_key = ((end - pd.Timedelta(days=1)).year, (end - pd.Timedelta(days=1)).month)
+            with app_metrics.span("chart", chart="wordcloud"):
+                png = load_wordcloud_cache(data_version).render(first_key, last_key, width=800, height=400)
+                if png:
+                    st.image(png, use_container_width=True)
 
             # --- PODROBNA TABELA ---
             st.subheader("📝 Podrobni podatki")
@@ -253,5 +361,26 @@ elif page == "⭐ Reviews":
                 }
             )
         else:
-            st.warning(f"Ni mnenj za {selected_month}.")
+            st.warning(f"Ni mnenj za {selected_period}.")
+
+# ==========================================
+# ČASI ZAGONA IN IZRISA
+# ==========================================
+render_seconds = time.perf_counter() - RUN_START
+page_timings = st.session_state.setdefault('page_timings', {})
+if page not in page_timings:
+    page_timings[page] = {"first": render_seconds, "last": render_seconds, "runs": 0}
+page_timings[page]["last"] = render_seconds
+page_timings[page]["runs"] += 1
+app_metrics.observe("render_seconds", render_seconds, page=page)
 
+with st.sidebar.expander("⏱️ Časi"):
+    st.caption(f"Zagon: uvozi {startup['imports']:.2f}s | podatki {startup['data']:.2f}s")
+    warmup = model_warmup()
+    st.caption(f"AI model: {warmup.state} ({warmup.elapsed():.1f}s)")
+    for name, t in page_timings.items():
+        st.caption(f"{name}: prvi {t['first']:.2f}s | zadnji {t['last']:.2f}s ({t['runs']}x)")
+    col1, col2 = st.columns(2)
+    col1.download_button("JSON", json.dumps(app_metrics.report(), indent=2, ensure_ascii=False),
+                         "dashboard_metrics.json", "application/json")
+    col2.download_button("Prometheus", app_metrics.prometheus(), "dashboard_metrics.prom", "text/plain")
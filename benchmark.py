@@ -0,0 +1,343 @@
+import os
+import gc
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import date, timedelta
+
+from sink import write_json_array
+from state import SECTIONS
+
+RESULTS_FOLDER = "benchmark_results"
+DEFAULT_ROWS = 10_000
+SEED = 42
+
+# Datumi kot na straneh: večinoma ISO (scraper), nekaj izpisanih z besedo
+DATE_STYLES = [("%Y-%m-%d", 0.90), ("%B %d, %Y", 0.08), ("%b %d, %Y", 0.02)]
+FIRST_DATE = date(2021, 1, 1)
+DAYS = 4 * 365
+
+WORDS = """
+energy drink flavor great taste boost bottle design gamer fun refreshing tropical sweet
+chocolate candy box potion red blue teal dark cherry mint fresh delivery shipping fast
+slow price value quality support service team app tool workflow recommend awesome
+excellent good bad terrible okay package arrived broken perfect love hate again order
+""".split()
+ADJECTIVES = ["Dark", "Red", "Blue", "Teal", "Green", "Golden", "Tiny", "Mega", "Classic", "Sour", "Spicy"]
+NOUNS = ["Energy Potion", "Chocolate Candy", "Cat-Ear Beanie", "Running Shoes", "Hiking Boots",
+         "Gaming Mouse", "Coffee Mug", "Hot Sauce", "Tea Set", "Water Bottle"]
+
+
+# ==========================================
+# SINTETIČNI PODATKI
+# ==========================================
+def sentence(rng, min_words, max_words):
+    words = rng.choices(WORDS, k=rng.randint(min_words, max_words))
+    return " ".join(words).capitalize() + rng.choice([".", "!", "."])
+
+
+def product_name(i):
+    """Unikatno, a realistično ime produkta"""
+    adjective = ADJECTIVES[i % len(ADJECTIVES)]
+    noun = NOUNS[(i // len(ADJECTIVES)) % len(NOUNS)]
+    return f"{adjective} {noun} {i // (len(ADJECTIVES) * len(NOUNS)) + 1}"
+
+
+def generate_products(n, rng):
+    for i in range(n):
+        yield {"name": product_name(i), "price": f"${rng.uniform(0.5, 250):.2f}"}
+
+
+def generate_reviews(n, rng):
+    formats, weights = zip(*DATE_STYLES)
+    for _ in range(n):
+        day = FIRST_DATE + timedelta(days=rng.randrange(DAYS))
+        yield {
+            "date": day.strftime(rng.choices(formats, weights)[0]),
+            # Dolžina kot na strani: ena do tri povedi
+            "review_text": " ".join(sentence(rng, 6, 16) for _ in range(rng.randint(1, 3))),
+            "rating": rng.choices([1, 2, 3, 4, 5], [5, 5, 10, 30, 50])[0],
+        }
+
+
+def generate_testimonials(n, rng):
+    for _ in range(n):
+        yield {"text": sentence(rng, 8, 24), "rating": rng.choices([1, 2, 3, 4, 5], [2, 3, 10, 35, 50])[0]}
+
+
+def generate_dataset(folder, sizes, seed=SEED):
+    """Zapiše {section}.json v formatu scraperja"""
+    os.makedirs(folder, exist_ok=True)
+    generators = {
+        "products": generate_products,
+        "reviews": generate_reviews,
+        "testimonials": generate_testimonials,
+    }
+    for section, generate in generators.items():
+        rng = random.Random(f"{seed}-{section}")
+        write_json_array(os.path.join(folder, f"{section}.json"), generate(sizes[section], rng))
+        print(f"✓ {section.capitalize()}: {sizes[section]} sintetičnih zapisov")
+
+
+def generate_products_page(page, per_page, rng):
+    for i in range((page - 1) * per_page, page * per_page):
+        yield {"name": product_name(i), "price": f"${rng.uniform(0.5, 250):.2f}"}
+
+
+def write_product_pages(folder, pages, per_page=12, seed=SEED):
+    """HTML strani produktov za stub strežnik (ista struktura kot /products?page=N)"""
+    from http_scraper import recorded_filename
+
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(f"{seed}-html")
+    for page in range(1, pages + 1):
+        items = "".join(
+            f'<div class="product"><h3><a href="#">{p["name"]}</a></h3>'
+            f'<div class="short-description">{sentence(rng, 5, 12)}</div>'
+            f'<div class="price">{p["price"]}</div></div>'
+            for p in generate_products_page(page, per_page, rng)
+        )
+        page_html = f"<html><body><div class='catalog'>{items}</div></body></html>"
+        with open(os.path.join(folder, recorded_filename('/products', f'page={page}')), 'w', encoding='utf-8') as f:
+            f.write(page_html)
+
+
+# ==========================================
+# MERJENJE
+# ==========================================
+def measure(results, name, fn, **info):
+    """Izmeri čas in največjo porabo pomnilnika (tracemalloc) enega koraka"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    value, error = None, None
+    try:
+        value = fn()
+    except ImportError as e:
+        error = f"preskočeno: {e}"
+    except Exception as e:
+        # Brez omrežja/modela ipd. - zabeleži in nadaljuj, da meritve ostanejo
+        error = f"napaka: {type(e).__name__}: {e}"
+    seconds = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {"name": name, "seconds": round(seconds, 4), "peak_mb": round(peak / 2**20, 2), **info}
+    if error:
+        result["error"] = error
+    results.append(result)
+    status = error or f"{seconds:8.3f}s | {peak / 2**20:8.1f} MB"
+    print(f"   {name:<28} {status}")
+    return value
+
+
+def per_query(fn, queries):
+    """Povprečen čas ene poizvedbe (ms)"""
+    start = time.perf_counter()
+    for query in queries:
+        fn(query)
+    return round((time.perf_counter() - start) / max(len(queries), 1) * 1000, 4)
+
+
+# ==========================================
+# KORAKI
+# ==========================================
+def bench_dashboard(results, folder):
+    """Poizvedbe dashboarda na Storage: obdobja reviews, iskanje produktov, strani testimonialov"""
+    import loader
+    import rollups
+    import search
+    import storage
+
+    db = measure(results, "storage_open", lambda: storage.Storage.open(folder))
+    if db is None:
+        return None
+    measure(results, "storage_import", lambda: db.sync_views(folder))
+    # Tipizirani pogledi iz baze in branje prek memory mapa (JSON brez pyarrow)
+    measure(results, "export_columnar", lambda: [db.export_columnar(folder, s) for s in SECTIONS])
+    measure(results, "load_data", lambda: loader.load_data(folder))
+
+    months = db.review_months()
+    if months:
+        month_queries = [rollups.month_bounds(*m) for m in months]
+        start, end = month_queries[0][0], month_queries[-1][1]
+        measure(results, "reviews_between_all", lambda: db.reviews_between(start, end))
+        results[-1]["month_filter_ms"] = per_query(lambda b: db.reviews_between(*b), month_queries)
+        results[-1]["sentiment_summary_ms"] = per_query(lambda b: db.sentiment_summary(*b), month_queries)
+        results[-1]["monthly_summary_ms"] = per_query(lambda b: db.monthly_summary(*b), month_queries)
+
+    queries = ["energy", "choc", "potio", "beanie 3", "mug"]
+    measure(results, "product_search", lambda: [db.search_products(q, limit=1000) for q in queries])
+    results[-1]["query_ms"] = per_query(lambda q: db.search_products(q, limit=1000), queries)
+    results[-1]["price_filter_ms"] = per_query(lambda q: db.search_products(q, 10, 50, limit=1000), queries)
+
+    # Indeks za tipkarske napake (app ga zgradi šele, ko SQL nima zadetkov)
+    products = db.search_products()
+    index = measure(results, "fuzzy_index_build", lambda: search.ProductIndex.from_frame(products))
+    if index is not None:
+        results[-1]["fuzzy_query_ms"] = per_query(index.search, ["energi potoin", "chocolat", "beenie"])
+
+    ratings = tuple(r for r in db.rating_histogram("testimonials") if r is not None)
+    measure(results, "testimonials_page", lambda: db.testimonials_page(ratings, 25))
+    results[-1]["page_ms"] = per_query(lambda offset: db.testimonials_page(ratings, 25, offset),
+                                       range(0, 25 * 40, 25))
+    results[-1]["histogram_ms"] = per_query(lambda r: db.rating_histogram("testimonials", r),
+                                            [ratings, ratings[-2:]])
+    return db
+
+
+def bench_wordcloud(results, db):
+    import wordcloud_index
+
+    index = measure(results, "wordcloud_index_build",
+                    lambda: wordcloud_index.WordIndex.from_texts(db.iter_review_texts()))
+    months = index.months() if index is not None else []
+    if not months:
+        return
+    cache = wordcloud_index.WordCloudCache(index)
+    measure(results, "wordcloud_render", lambda: cache.render(months[-1]))
+    measure(results, "wordcloud_render_cached", lambda: cache.render(months[-1]))
+
+
+def bench_sentiment(results, db, sample, backend):
+    import sentiment
+
+    texts = [text for (text,) in db.iter_rows("SELECT review_text FROM reviews ORDER BY id LIMIT ?", (sample,))]
+    model = measure(results, "sentiment_load", lambda: sentiment.load_model(backend), backend=backend)
+    if model is not None:
+        measure(results, "sentiment_inference", lambda: model(texts), backend=backend, texts=len(texts))
+        if "error" not in results[-1]:
+            results[-1]["per_second"] = round(len(texts) / max(results[-1]["seconds"], 1e-9), 1)
+
+
+def bench_html(results, folder, pages, concurrency, generate=False):
+    """Posnete (ali z `generate` sintetične) strani prek lokalnega stub strežnika in HTTP scraperja"""
+    try:
+        import http_scraper
+    except ImportError as e:
+        # Brez aiohttp/lxml - ostali koraki ostanejo v rezultatih
+        results.append({"name": "http_replay", "seconds": 0, "peak_mb": 0, "error": f"preskočeno: {e}"})
+        print(f"   {'http_replay':<28} preskočeno: {e}")
+        return
+    from http_scraper import recorded_filename, serve_recorded_pages, parse_products_html
+
+    if generate:
+        write_product_pages(folder, pages)
+    server, base_url = serve_recorded_pages(folder)
+    try:
+        products = measure(results, "http_replay",
+                           lambda: http_scraper.scrape_products(base_url, pages, concurrency),
+                           pages=pages, concurrency=concurrency)
+        if products is not None:
+            results[-1]["products"] = len(products)
+    finally:
+        server.shutdown()
+
+    first_page = os.path.join(folder, recorded_filename('/products', 'page=1'))
+    if os.path.exists(first_page):
+        with open(first_page, 'r', encoding='utf-8') as f:
+            page_html = f.read()
+        measure(results, "parse_products_html", lambda: [parse_products_html(page_html) for _ in range(100)],
+                repeats=100)
+
+
+# ==========================================
+# POROČILO
+# ==========================================
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def save_results(results, meta, out_path=None):
+    """Shrani rezultate kot JSON (za primerjavo med verzijami)"""
+    out_path = out_path or os.path.join(RESULTS_FOLDER, f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, ensure_ascii=False)
+    print(f"\n💾 Rezultati: {out_path}")
+    return out_path
+
+
+def compare_results(results, baseline_path):
+    """Izpiše spremembo časa glede na prejšnji JSON"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"\n📊 PRIMERJAVA z {baseline_path}")
+    for r in results:
+        old = baseline.get(r["name"])
+        if not old or "error" in r or "error" in old or not old["seconds"]:
+            continue
+        change = (r["seconds"] - old["seconds"]) / old["seconds"]
+        flag = "⚠️ " if change > 0.2 else "  "
+        print(f"{flag} {r['name']:<28} {old['seconds']:8.3f}s -> {r['seconds']:8.3f}s ({change:+.0%})")
+
+
+def run(sizes, folder=None, sentiment_sample=256, backend=None,
+        html_pages=20, recorded=None, concurrency=5, out_path=None, baseline=None):
+    """Generira podatke, izmeri vse korake in shrani JSON"""
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = folder or os.path.join(tmp, "data")
+        print(f"🧪 BENCHMARK ({', '.join(f'{s}={n}' for s, n in sizes.items())})")
+        measure(results, "generate", lambda: generate_dataset(folder, sizes))
+
+        print("\n⏱️  KORAKI")
+        db = bench_dashboard(results, folder)
+        if db is not None:
+            try:
+                bench_wordcloud(results, db)
+                if sentiment_sample:
+                    import sentiment
+                    bench_sentiment(results, db, sentiment_sample, backend or sentiment.BACKEND)
+            finally:
+                db.close()
+
+        bench_html(results, recorded or os.path.join(tmp, "html"), html_pages, concurrency, generate=not recorded)
+
+    meta = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": git_commit(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "sizes": sizes,
+    }
+    path = save_results(results, meta, out_path)
+    if baseline:
+        compare_results(results, baseline)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark scraper -> dashboard na sintetičnih podatkih")
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="zapisov na sekcijo (10k - 1M)")
+    parser.add_argument("--products", type=int, help="število produktov (privzeto --rows)")
+    parser.add_argument("--reviews", type=int, help="število reviews (privzeto --rows)")
+    parser.add_argument("--testimonials", type=int, help="število testimonialov (privzeto --rows)")
+    parser.add_argument("--data-folder", help="kam zapisati sintetične podatke (privzeto začasna mapa)")
+    parser.add_argument("--sentiment-sample", type=int, default=256, help="besedil za inferenco (0 = preskoči)")
+    parser.add_argument("--backend", help="sentiment backend (privzeto SENTIMENT_BACKEND)")
+    parser.add_argument("--html-pages", type=int, default=20, help="strani produktov za stub strežnik")
+    parser.add_argument("--recorded", help="mapa s posnetimi stranmi (record_pages) namesto sintetičnih")
+    parser.add_argument("--concurrency", type=int, default=5)
+    parser.add_argument("--out", help=f"JSON z rezultati (privzeto {RESULTS_FOLDER}/benchmark_<čas>.json)")
+    parser.add_argument("--baseline", help="prejšnji JSON za primerjavo")
+    args = parser.parse_args()
+
+    sizes = {
+        "products": args.products or args.rows,
+        "reviews": args.reviews or args.rows,
+        "testimonials": args.testimonials or args.rows,
+    }
+    run(sizes, args.data_folder, args.sentiment_sample, args.backend,
+        args.html_pages, args.recorded, args.concurrency, args.out, args.baseline)
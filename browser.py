@@ -0,0 +1,197 @@
+import os
+import time
+import threading
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import SessionNotCreatedException
+
+PROFILES = ["lean", "default"]
+PROFILE = os.environ.get("BROWSER_PROFILE", "lean")
+
+# Pot do chromedriverja: okolje, sicer zapomnjena pot (ChromeDriverManager samo prvič)
+DRIVER_ENV = "CHROMEDRIVER"
+DRIVER_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scraped_data', 'chromedriver_path.txt')
+
+# Viri, ki jih scraper ne rabi (DevTools Network.setBlockedURLs, * = poljubno).
+# Zvezdice so inline SVG, zato jih blokiranje slik ne skrije; CSS ostane
+# zaradi postavitve strani (infinite scroll meri višino).
+BLOCKED_URLS = [
+    # Slike (tudi CSS ozadja) in mediji
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.svg",
+    "*.mp4", "*.webm", "*.mp3",
+    # Pisave
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    # Analitika in oglasi tretjih strani
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*hotjar.com*",
+]
+
+LEAN_ARGS = [
+    "--headless=new",
+    "--blink-settings=imagesEnabled=false",
+    "--disable-remote-fonts",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--window-size=1280,1024",
+]
+
+_driver_lock = threading.Lock()
+_driver_path = None
+
+
+def driver_path(stale=None):
+    """Pot do chromedriverja; ChromeDriverManager (in omrežje) samo ob prvem zagonu.
+
+    `stale` je pot, ki ne ustreza več Chromu (npr. po posodobitvi): zavrže
+    se in driver se namesti znova - samo enkrat, tudi če jo zavrne več workerjev.
+    """
+    global _driver_path
+    with _driver_lock:
+        refresh = stale is not None and _driver_path in (stale, None)
+        if refresh:
+            _driver_path = None
+            if os.path.exists(DRIVER_CACHE):
+                os.remove(DRIVER_CACHE)
+        if _driver_path:
+            return _driver_path
+        path = None if refresh else os.environ.get(DRIVER_ENV)
+        if not path and os.path.exists(DRIVER_CACHE):
+            with open(DRIVER_CACHE, 'r', encoding='utf-8') as f:
+                path = f.read().strip()
+        if not path or not os.access(path, os.X_OK):
+            from webdriver_manager.chrome import ChromeDriverManager
+            path = ChromeDriverManager().install()
+            os.makedirs(os.path.dirname(DRIVER_CACHE), exist_ok=True)
+            with open(DRIVER_CACHE, 'w', encoding='utf-8') as f:
+                f.write(path)
+        _driver_path = path
+        return path
+
+
+def chrome_options(profile=PROFILE):
+    """Chrome nastavitve profila (default = privzeti Chrome z oknom)"""
+    options = webdriver.ChromeOptions()
+    if profile == "lean":
+        for arg in LEAN_ARGS:
+            options.add_argument(arg)
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+        # Ne čakaj na slike/iframe - Waiter čaka na elemente, ki jih rabimo
+        options.page_load_strategy = "eager"
+    return options
+
+
+def create_driver(profile=PROFILE):
+    """Zažene Chrome s profilom; lean blokira nepotrebne vire prek DevTools"""
+    if profile not in PROFILES:
+        raise ValueError(f"Neznan profil brskalnika: {profile} (možni: {', '.join(PROFILES)})")
+    path = driver_path()
+    try:
+        driver = webdriver.Chrome(service=Service(path), options=chrome_options(profile))
+    except SessionNotCreatedException:
+        # Zapomnjeni driver ne ustreza več nameščenemu Chromu - namesti znova in poskusi enkrat
+        print("⚠️  chromedriver ne ustreza Chromu - ponovno nameščam")
+        driver = webdriver.Chrome(service=Service(driver_path(stale=path)), options=chrome_options(profile))
+    if profile == "lean":
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
+
+
+# ==========================================
+# PORABA POMNILNIKA
+# ==========================================
+def _proc_children():
+    """{pid: [otroci]} iz /proc (Linux)"""
+    children = {}
+    for name in os.listdir('/proc'):
+        if not name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{name}/stat', 'r') as f:
+                # ppid je 2. polje za imenom procesa v oklepajih
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def _proc_rss(pid):
+    try:
+        with open(f'/proc/{pid}/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+def driver_rss(driver):
+    """RSS (bajti) chromedriverja in vseh Chrome procesov pod njim; None brez /proc"""
+    process = getattr(driver.service, 'process', None)
+    if process is None or not os.path.isdir('/proc'):
+        return None
+    children = _proc_children()
+    total, stack = 0, [process.pid]
+    while stack:
+        pid = stack.pop()
+        total += _proc_rss(pid)
+        stack.extend(children.get(pid, ()))
+    return total
+
+
+def measure_profile(profile, pages, repeats=3):
+    """Zagon, čas nalaganja strani (po korakih) in RSS za en profil.
+
+    `pages` so (ime, url, selektor); vsaka stran se naloži `repeats`-krat
+    na istem brskalniku, kot pri ponovni uporabi v bazenu.
+    """
+    from waits import Waiter
+
+    start = time.perf_counter()
+    driver = create_driver(profile)
+    result = {"profile": profile, "launch": time.perf_counter() - start, "pages": {}}
+    try:
+        waiter = Waiter(driver)
+        for name, url, selector in pages:
+            seconds = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                driver.get(url)
+                waiter.for_elements("page_load", selector)
+                seconds.append(time.perf_counter() - start)
+            result["pages"][name] = seconds
+        result["rss"] = driver_rss(driver)
+    finally:
+        driver.quit()
+    return result
+
+
+def compare_profiles(pages, repeats=3):
+    """Izmeri lean proti privzetemu profilu in izpiše primerjavo"""
+    print("\n⏱️  PRIMERJAVA: lean vs default Chrome")
+    results = {profile: measure_profile(profile, pages, repeats) for profile in ["default", "lean"]}
+
+    def mib(value):
+        return f"{value / 2**20:8.1f} MiB" if value else "       n/a"
+
+    print("="*60)
+    print(f"{'':<16} {'default':>12} {'lean':>12}")
+    print(f"{'zagon':<16} {results['default']['launch']:11.2f}s {results['lean']['launch']:11.2f}s")
+    for name, _, _ in pages:
+        default = min(results['default']['pages'][name])
+        lean = min(results['lean']['pages'][name])
+        print(f"{name:<16} {default:11.2f}s {lean:11.2f}s" + (f"  ({default / lean:.1f}x)" if lean > 0 else ""))
+    print(f"{'RSS':<16} {mib(results['default']['rss']):>12} {mib(results['lean']['rss']):>12}")
+    print("="*60)
+    return results
@@ -0,0 +1,89 @@
+import os
+from itertools import islice
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from parsers import DATE_FORMATS
+
+# Tipizirani stolpci: datum kot timestamp, ocena kot int8, besedilo kot string.
+# AI stolpci so prazni, dokler reviewov ne obdela `python sentiment.py`.
+SCHEMAS = {
+    "products": pa.schema([("name", pa.string()), ("price", pa.string())]),
+    "reviews": pa.schema([
+        ("date", pa.timestamp("ms")),
+        ("review_text", pa.string()),
+        ("rating", pa.int8()),
+        ("AI Sentiment", pa.string()),
+        ("AI Confidence", pa.float32()),
+    ]),
+    "testimonials": pa.schema([("text", pa.string()), ("rating", pa.int8())]),
+}
+BATCH_ROWS = 10_000   # vrstic na RecordBatch / row group
+DATE_SAMPLE = 200     # vrstic za izbiro formata datuma
+
+
+def parse_dates(values, formats=DATE_FORMATS, sample_size=DATE_SAMPLE):
+    """Datumi -> 'YYYY-MM-DD' (None, če ni v nobenem formatu) v vektorskih prehodih.
+
+    Format se izbere enkrat na stolpec iz vzorca; ostali formati se
+    poskusijo samo, če ostanejo neprebrane vrstice.
+    """
+    dates = pc.utf8_trim_whitespace(pa.array(values, pa.string()))
+    sample = dates.drop_null().slice(0, sample_size)
+    misses = {fmt: pc.strptime(sample, format=fmt, unit='s', error_is_null=True).null_count for fmt in formats}
+
+    parsed = pa.nulls(len(dates), pa.timestamp('s'))
+    for fmt in sorted(formats, key=misses.get):
+        missing = pc.and_(pc.is_null(parsed), pc.is_valid(dates))
+        if not pc.any(missing).as_py():
+            break
+        parsed = pc.coalesce(parsed, pc.strptime(dates, format=fmt, unit='s', error_is_null=True))
+    return pc.strftime(parsed, format='%Y-%m-%d').to_pylist()
+
+
+def to_batch(section, rows):
+    """Vrstice (v vrstnem redu stolpcev sheme) -> RecordBatch s shemo sekcije"""
+    schema = SCHEMAS[section]
+    columns = list(zip(*rows)) if rows else [() for _ in schema]
+    arrays = []
+    for field, values in zip(schema, columns):
+        if field.name == "date":
+            # ISO datum iz baze -> timestamp v enem castu (brez strptime po vrsticah)
+            arrays.append(pa.array(values, pa.string()).cast(field.type))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_columnar(data_folder, section, rows, batch_rows=BATCH_ROWS):
+    """Zapiše {section}.arrow (za memory-mapped branje) in {section}.parquet.
+
+    `rows` se bere po paketih, zato poraba pomnilnika ni odvisna od
+    velikosti sekcije; vrne število vrstic.
+    """
+    schema = SCHEMAS[section]
+    arrow_path = os.path.join(data_folder, f'{section}.arrow')
+    parquet_path = os.path.join(data_folder, f'{section}.parquet')
+    rows = iter(rows)
+    total = 0
+    with pa.OSFile(arrow_path + ".tmp", 'wb') as sink, \
+            pa.ipc.new_file(sink, schema) as arrow_writer, \
+            pq.ParquetWriter(parquet_path + ".tmp", schema) as parquet_writer:
+        chunk = list(islice(rows, batch_rows))
+        while chunk:
+            batch = to_batch(section, chunk)
+            arrow_writer.write_batch(batch)
+            parquet_writer.write_batch(batch)
+            total += batch.num_rows
+            chunk = list(islice(rows, batch_rows))
+    os.replace(arrow_path + ".tmp", arrow_path)
+    os.replace(parquet_path + ".tmp", parquet_path)
+    return total
+
+
+def read_arrow(path):
+    """Prebere Arrow IPC datoteko prek memory mapa (brez kopiranja v RAM)"""
+    source = pa.memory_map(path, 'r')
+    return pa.ipc.open_file(source).read_all()
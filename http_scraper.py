@@ -0,0 +1,164 @@
+import os
+import re
+import time
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+import aiohttp
+from lxml import html as lxml_html
+
+from parsers import parse_product, product_key, merge_product_pages
+
+BASE_URL = "https://web-scraping.dev"
+MAX_PAGES = 10
+CONCURRENCY = 5
+PRODUCT_XPATH = "//div[contains(@class, 'product')]"
+
+
+# ==========================================
+# HTML -> BESEDILO
+# ==========================================
+def element_text(element):
+    """Vrne besedilo elementa po vrsticah (kot Selenium .text)"""
+    lines = []
+    for chunk in element.itertext():
+        for line in chunk.split('\n'):
+            line = line.strip()
+            if line:
+                lines.append(line)
+    return '\n'.join(lines)
+
+
+def parse_products_html(page_html):
+    """Iz HTML strani produktov vrne seznam {"name", "price"}"""
+    if not page_html:
+        return []
+    doc = lxml_html.fromstring(page_html)
+    products = []
+    for el in doc.xpath(PRODUCT_XPATH):
+        product = parse_product(element_text(el))
+        if product:
+            products.append(product)
+    return products
+
+
+# ==========================================
+# ASYNC FETCH
+# ==========================================
+async def fetch_page(session, semaphore, url):
+    """Prenese eno stran, ob napaki vrne None"""
+    async with semaphore:
+        try:
+            async with session.get(url) as response:
+                if response.status != 200:
+                    return None
+                return await response.text()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return None
+
+
+async def fetch_product_pages(base_url=BASE_URL, start_page=1, max_pages=MAX_PAGES, concurrency=CONCURRENCY):
+    """Prenese strani produktov vzporedno (po `concurrency` naenkrat) -> {stran: [produkti]}"""
+    pages_data = {}
+    seen_products = set()
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=30)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+        page = start_page
+        while page <= max_pages:
+            batch = list(range(page, min(page + concurrency, max_pages + 1)))
+            pages = await asyncio.gather(*[
+                fetch_page(session, semaphore, f"{base_url}/products?page={n}")
+                for n in batch
+            ])
+
+            # Ustavi se na prvi prazni strani ali strani brez novih produktov
+            stop = False
+            for n, page_html in zip(batch, pages):
+                found = parse_products_html(page_html)
+                pages_data[n] = found
+                keys = {product_key(p) for p in found}
+                if not keys - seen_products:
+                    stop = True
+                    break
+                seen_products |= keys
+
+            if stop:
+                break
+            page += len(batch)
+
+    return pages_data
+
+
+def scrape_product_pages(base_url=BASE_URL, start_page=1, max_pages=MAX_PAGES, concurrency=CONCURRENCY):
+    """Sinhroni vmesnik za fetch_product_pages"""
+    return asyncio.run(fetch_product_pages(base_url, start_page, max_pages, concurrency))
+
+
+def scrape_products(base_url=BASE_URL, max_pages=MAX_PAGES, concurrency=CONCURRENCY):
+    """Vsi produkti brez duplikatov"""
+    return merge_product_pages(scrape_product_pages(base_url, 1, max_pages, concurrency))
+
+
+# ==========================================
+# POSNETE STRANI (STUB STREŽNIK)
+# ==========================================
+def recorded_filename(path, query):
+    """Ime datoteke za posneto stran, npr. products_page_2.html"""
+    name = path.strip('/').replace('/', '_') or 'index'
+    page = parse_qs(query).get('page')
+    if page:
+        name += f"_page_{page[0]}"
+    return re.sub(r'[^\w.-]', '_', name) + '.html'
+
+
+def record_pages(folder, base_url=BASE_URL, max_pages=MAX_PAGES):
+    """Shrani HTML strani produktov za kasnejše testiranje"""
+    os.makedirs(folder, exist_ok=True)
+
+    async def _record():
+        async with aiohttp.ClientSession() as session:
+            for n in range(1, max_pages + 1):
+                async with session.get(f"{base_url}/products?page={n}") as response:
+                    page_html = await response.text()
+                with open(os.path.join(folder, recorded_filename('/products', f'page={n}')), 'w', encoding='utf-8') as f:
+                    f.write(page_html)
+
+    asyncio.run(_record())
+
+
+def serve_recorded_pages(folder, port=0):
+    """Zažene lokalni HTTP strežnik s posnetimi stranmi, vrne (server, base_url)"""
+
+    class RecordedHandler(SimpleHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            file_path = os.path.join(folder, recorded_filename(url.path, url.query))
+            if not os.path.exists(file_path):
+                self.send_error(404)
+                return
+            with open(file_path, 'rb') as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), RecordedHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    start = time.perf_counter()
+    result = scrape_products()
+    print(f"\n✅ {len(result)} products v {time.perf_counter() - start:.2f}s")
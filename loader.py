@@ -0,0 +1,107 @@
+import os
+import json
+import calendar
+import pandas as pd
+
+from parsers import DATE_FORMATS
+from paths import find_data_folder, section_file
+from state import SECTIONS
+
+MONTH_NAMES = list(calendar.month_name)[1:]
+
+
+def read_section(data_folder, section):
+    """Arrow prek memory mapa, če obstaja in ni starejši od JSON; sicer JSON"""
+    json_path = section_file(data_folder, section, 'json')
+    arrow_path = section_file(data_folder, section, 'arrow')
+
+    fresh = os.path.exists(arrow_path) and (
+        not os.path.exists(json_path) or os.path.getmtime(arrow_path) >= os.path.getmtime(json_path)
+    )
+    if fresh:
+        try:
+            from columnar import read_arrow
+            return read_arrow(arrow_path).to_pandas(split_blocks=True)
+        except ImportError:
+            pass
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        return pd.DataFrame(json.load(f))
+
+
+def detect_date_format(dates, sample_size=200):
+    """Format datuma, ki ustreza največ vzorcem stolpca (enkrat na stolpec)"""
+    sample = dates.dropna().head(sample_size)
+    if sample.empty:
+        return None
+    scores = {
+        fmt: pd.to_datetime(sample, format=fmt, errors='coerce').notna().sum()
+        for fmt in DATE_FORMATS
+    }
+    best = max(scores, key=scores.get)
+    return best if scores[best] > 0 else None
+
+
+def parse_dates(dates):
+    """Vektorsko parsanje stolpca datumov -> (datetime64 stolpec, št. neuspelih)"""
+    if pd.api.types.is_datetime64_any_dtype(dates):
+        # Arrow: datum je že timestamp
+        return dates, int(dates.isna().sum())
+
+    dates = dates.astype('string').str.strip()
+    best = detect_date_format(dates)
+    formats = [best] + [f for f in DATE_FORMATS if f != best] if best else DATE_FORMATS
+
+    parsed = pd.Series(pd.NaT, index=dates.index, dtype='datetime64[ns]')
+    for fmt in formats:
+        missing = parsed.isna() & dates.notna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(dates[missing], format=fmt, errors='coerce')
+
+    return parsed, int(parsed.isna().sum())
+
+
+def compact_ratings(df):
+    """Ocena kot int8 (Int8, če manjka kakšna vrednost)"""
+    if 'rating' in df:
+        rating = pd.to_numeric(df['rating'], errors='coerce')
+        df['rating'] = rating.astype('Int8' if rating.isna().any() else 'int8')
+    return df
+
+
+def add_month_columns(reviews):
+    """Iz date_parsed doda month (Int8), year (Int16) in urejen kategoričen month_name"""
+    parsed = reviews['date_parsed']
+    reviews['month'] = parsed.dt.month.astype('Int8')
+    reviews['year'] = parsed.dt.year.astype('Int16')
+    reviews['month_name'] = pd.Categorical(parsed.dt.month_name(), categories=MONTH_NAMES, ordered=True)
+    return reviews
+
+
+def add_date_columns(reviews):
+    """Doda date_parsed, month, year in month_name; vrne (reviews, št. neuspelih datumov)"""
+    if reviews.empty or 'date' not in reviews:
+        return reviews, 0
+
+    parsed, failed = parse_dates(reviews['date'])
+    reviews['date_parsed'] = parsed
+    return add_month_columns(reviews), failed
+
+
+def load_data(data_folder=None):
+    """Naloži scraped podatke kot DataFrame za vsako sekcijo.
+    
+    Datumi, ki jih ni mogoče prebrati, ostanejo prazni (NaT) - njihovo
+    število je v data['unparsed_dates'].
+    """
+    data_folder = data_folder or find_data_folder()
+    try:
+        data = {section: compact_ratings(read_section(data_folder, section)) for section in SECTIONS}
+        data['reviews'], data['unparsed_dates'] = add_date_columns(data['reviews'])
+        return data
+    except Exception:
+        # Če napaka, vrni prazne strukture, da app ne crashne takoj
+        data = {section: pd.DataFrame() for section in SECTIONS}
+        data['unparsed_dates'] = 0
+        return data
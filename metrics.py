@@ -0,0 +1,197 @@
+import os
+import json
+import time
+import pstats
+import bisect
+import cProfile
+import threading
+from contextlib import contextmanager
+
+# Meje histogramov (sekunde) - od enega JS klica do celega scrapa sekcije
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+PROFILE_ENV = "METRICS_PROFILE"     # npr. "serialize,page_load" ali "*" za vse faze
+
+
+def profile_stages(value=None):
+    """Faze za cProfile iz argumenta ali okolja ("a,b" -> {"a", "b"})"""
+    value = value if value is not None else os.environ.get(PROFILE_ENV, "")
+    return {stage.strip() for stage in value.split(",") if stage.strip()}
+
+
+def label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(key, extra=()):
+    """{k="v",...} za Prometheus ("" brez labelov)"""
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{escape_label(v)}"' for k, v in pairs) + "}"
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def cumulative(self):
+        """(meja, število <= meja) kot v Prometheusu, zadnja meja je +Inf"""
+        total = 0
+        for bound, count in zip(list(self.buckets) + [float("inf")], self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics:
+    """Števci, histogrami in časovni razponi (spani) faz enega procesa.
+
+    span() izmeri fazo v histogram `stage_seconds{stage=...}`; za faze iz
+    `profile` (ali METRICS_PROFILE) še cProfile, ki se zapiše v .prof.
+    """
+
+    def __init__(self, prefix, buckets=BUCKETS, profile=None):
+        self.prefix = prefix
+        self.buckets = buckets
+        self.profile = profile_stages() if profile is None else set(profile)
+        self.started = time.time()
+        self.counters = {}
+        self.histograms = {}
+        self.profiles = {}
+        self._lock = threading.Lock()
+
+    # ==========================================
+    # ZAPISOVANJE
+    # ==========================================
+    def inc(self, name, value=1, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """Izmeri trajanje faze (in jo po želji profilira)"""
+        profiler = None
+        if stage in self.profile or "*" in self.profile:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # V drugi niti že teče profiler - to fazo samo izmerimo
+                profiler = None
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            if profiler:
+                profiler.disable()
+                with self._lock:
+                    if stage in self.profiles:
+                        self.profiles[stage].add(profiler)
+                    else:
+                        self.profiles[stage] = pstats.Stats(profiler)
+            self.observe("stage_seconds", seconds, stage=stage, **labels)
+
+    # ==========================================
+    # IZVOZ
+    # ==========================================
+    def report(self):
+        """Poročilo zagona kot slovar (za JSON)"""
+        with self._lock:
+            return {
+                "prefix": self.prefix,
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "duration": round(time.time() - self.started, 3),
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": h.count,
+                        "sum": round(h.sum, 6),
+                        "min": h.min,
+                        "max": h.max,
+                        "buckets": {("+Inf" if bound == float("inf") else str(bound)): total
+                                    for bound, total in h.cumulative()},
+                    }
+                    for (name, labels), h in sorted(self.histograms.items())
+                ],
+            }
+
+    def prometheus(self):
+        """Števci in histogrami v Prometheus text formatu"""
+        lines = []
+        with self._lock:
+            typed = set()
+            for (name, labels), value in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{name}"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{format_labels(labels)} {value}")
+            for (name, labels), h in sorted(self.histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append(f"# TYPE {metric} histogram")
+                for bound, total in h.cumulative():
+                    le = "+Inf" if bound == float("inf") else str(bound)
+                    lines.append(f"{metric}_bucket{format_labels(labels, [('le', le)])} {total}")
+                lines.append(f"{metric}_sum{format_labels(labels)} {h.sum:.6f}")
+                lines.append(f"{metric}_count{format_labels(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_report(self, folder):
+        """Zapiše {prefix}_metrics.json, {prefix}_metrics.prom in .prof profilov; vrne pot JSON"""
+        os.makedirs(folder, exist_ok=True)
+        json_path = os.path.join(folder, f"{self.prefix}_metrics.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2, ensure_ascii=False)
+        with open(os.path.join(folder, f"{self.prefix}_metrics.prom"), 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        with self._lock:
+            for stage, stats in self.profiles.items():
+                stats.dump_stats(os.path.join(folder, f"{self.prefix}_{stage}.prof"))
+        return json_path
+
+    def summary(self, top=10):
+        """Izpiše faze z največ skupnega časa"""
+        stages = {}
+        with self._lock:
+            for (name, labels), h in self.histograms.items():
+                if name == "stage_seconds":
+                    stage = dict(labels)["stage"]
+                    count, seconds = stages.get(stage, (0, 0.0))
+                    stages[stage] = (count + h.count, seconds + h.sum)
+        if not stages:
+            return
+        print("\n📈 FAZE")
+        for stage, (count, seconds) in sorted(stages.items(), key=lambda s: -s[1][1])[:top]:
+            print(f"   {stage:<16} {count:>5}x | {seconds:8.2f}s | povp. {seconds / count * 1000:8.1f} ms")
@@ -0,0 +1,166 @@
+import re
+from datetime import datetime
+
+# ==========================================
+# PARSANJE ZAPISOV
+# ==========================================
+# Skupna logika za Selenium in HTTP način - obe poti dobita besedilo
+# elementa in iz njega sestavita enake zapise.
+
+SKIP_PRODUCT_NAMES = ['log in', 'sign up', 'products']
+PRICE_RE = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_product(text):
+    """Iz besedila produkta vrne {"name", "price"} ali None"""
+    text = (text or '').strip()
+    if not text or len(text) < 5:
+        return None
+
+    lines = text.split('\n')
+    name = lines[0].strip()
+
+    if len(name) < 3 or name.lower() in SKIP_PRODUCT_NAMES:
+        return None
+
+    # Najdi ceno
+    price = "$0.00"
+    for line in lines:
+        if '$' in line:
+            match = re.search(r'\$\d+\.\d{2}', line)
+            if match:
+                price = match.group(0)
+                break
+
+    return {
+        "name": name,
+        "price": price
+    }
+
+
+def parse_price(price):
+    """"$12.99" / "1,299.00 €" -> 12.99 / 1299.0 (None, če cene ni)"""
+    match = PRICE_RE.search(str(price or ''))
+    return float(match.group().replace(',', '')) if match else None
+
+
+def product_key(product):
+    """Ključ za odstranjevanje duplikatov produktov"""
+    return f"{product['name']}_{product['price']}"
+
+
+def merge_product_pages(pages_data):
+    """Združi strani {stran: [produkti]} po vrsti brez duplikatov"""
+    products_data = []
+    seen_products = set()
+
+    for page in sorted(pages_data):
+        products = pages_data[page]
+        if not products:
+            print(f"   Stran {page}: Ni produktov")
+            break
+
+        added = 0
+        for product in products:
+            product_id = product_key(product)
+            if product_id not in seen_products:
+                seen_products.add(product_id)
+                products_data.append(product)
+                added += 1
+
+        print(f"   Stran {page}: +{added} | Skupaj: {len(products_data)}")
+
+        if added == 0:
+            break
+
+    return products_data
+
+
+def last_product_page(pages_data):
+    """Zadnja stran, ki je imela produkte (0, če nobena)"""
+    return max((page for page, products in pages_data.items() if products), default=0)
+
+
+def stars_to_rating(stars):
+    """Število zvezdic v oceno (brez zvezdic = 5, kot prej)"""
+    return stars if stars and stars > 0 else 5
+
+
+def find_date(lines):
+    """Prva vrstica z letnico -> (datum, leto)"""
+    for line in lines:
+        if re.search(r'20\d{2}', line):
+            year_match = re.search(r'(20\d{2})', line)
+            return line, int(year_match.group(1)) if year_match else 0
+    return "", 0
+
+
+DATE_FORMATS = ['%B %d, %Y', '%b %d, %Y', '%Y-%m-%d', '%d.%m.%Y']
+
+
+def parse_date(date_str):
+    """Datum reviewa v datetime (None, če ni v nobenem znanem formatu)"""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime((date_str or '').strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_review(node):
+    """Iz {"text", "stars", "date"} vrne (review ali None, leto)"""
+    text = (node.get('text') or '').strip()
+    if not text:
+        return None, 0
+
+    lines = [l.strip() for l in text.split('\n') if l.strip()]
+
+    # Najdi datum - najprej iz date elementa, sicer iz vrstic
+    date_str, year = find_date([(node.get('date') or '').strip()])
+    if not date_str:
+        date_str, year = find_date(lines)
+
+    if not date_str:
+        return None, year
+
+    # Review text (najdaljša vrstica)
+    review_text = max(lines, key=len, default='')
+
+    if len(review_text) < 10:
+        return None, year
+
+    return {
+        "date": date_str,
+        "review_text": review_text,
+        "rating": stars_to_rating(node.get('stars'))
+    }, year
+
+
+def review_key(review):
+    """Ključ za odstranjevanje duplikatov reviewov (enak kot UNIQUE (date, review_text) v bazi)"""
+    return f"{review['review_text']}_{review['date']}"
+
+
+SKIP_TESTIMONIAL_WORDS = ['take a look', 'collection', 'navigation']
+
+
+def testimonial_key(testimonial):
+    """Ključ za odstranjevanje duplikatov testimonialov"""
+    return testimonial['text']
+
+
+def parse_testimonial(node):
+    """Iz {"text", "stars"} vrne {"text", "rating"} ali None"""
+    text = (node.get('text') or '').strip()
+
+    if not text or len(text) < 10 or len(text) > 400:
+        return None
+
+    if any(word in text.lower() for word in SKIP_TESTIMONIAL_WORDS):
+        return None
+
+    return {
+        "text": ' '.join(text.split()),
+        "rating": stars_to_rating(node.get('stars'))
+    }
@@ -0,0 +1,31 @@
+import os
+
+from state import SECTIONS
+
+
+def find_data_folder():
+    """Mapa s podatki (za Render deployment preverimo, kje so datoteke)"""
+    data_folder = 'scraped_data'
+    # Če mape ni (na Renderju včasih), preveri trenutno mapo
+    if not os.path.exists(data_folder):
+        data_folder = '.'
+    return data_folder
+
+
+def section_file(data_folder, section, ext):
+    """Pot do datoteke sekcije; če je ni v mapi, poskusi direktno (fallback)"""
+    path = os.path.join(data_folder, f'{section}.{ext}')
+    if not os.path.exists(path):
+        path = f'{section}.{ext}'
+    return path
+
+
+def data_version(data_folder=None):
+    """Časi spremembe datotek sekcij - nova verzija po vsakem scrapu/obogatitvi"""
+    data_folder = data_folder or find_data_folder()
+    version = []
+    for section in SECTIONS:
+        for ext in ('json', 'arrow'):
+            path = section_file(data_folder, section, ext)
+            version.append(os.path.getmtime(path) if os.path.exists(path) else None)
+    return tuple(version)
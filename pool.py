@@ -0,0 +1,82 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+POLL_SECONDS = 0.5   # kako pogosto čakajoči worker preveri, ali je bazen zaprt
+
+
+class DriverPool:
+    """Bazen brskalnikov: vsak worker dobi svoj driver, na koncu se zaprejo vsi"""
+
+    def __init__(self, factory, size):
+        self.factory = factory
+        self.size = max(1, size)
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._created = 0
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def _take(self):
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            # Rezerviraj mesto pod lockom, brskalnik pa zaženi zunaj njega
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Bazen brskalnikov je zaprt")
+                create = self._created < self.size
+                if create:
+                    self._created += 1
+            if create:
+                break
+
+            # Vsi brskalniki so zasedeni: čakaj s timeoutom, da zaprt bazen ne blokira večno
+            # (in da se sprosti mesto, če zagon brskalnika drugje ne uspe)
+            try:
+                return self._idle.get(timeout=POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+        try:
+            driver = self.factory()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+        with self._lock:
+            if self._closed:
+                driver.quit()
+                raise RuntimeError("Bazen brskalnikov je zaprt")
+            self._drivers.append(driver)
+        return driver
+
+    @contextmanager
+    def acquire(self):
+        """Izposodi driver za čas bloka"""
+        driver = self._take()
+        try:
+            yield driver
+        finally:
+            self._idle.put(driver)
+
+    def close(self):
+        """Zapre vse ustvarjene brskalnike"""
+        with self._lock:
+            self._closed = True
+            drivers, self._drivers = self._drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        return len(drivers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,38 @@
+import pandas as pd
+
+from loader import MONTH_NAMES
+
+SENTIMENT_COLUMNS = ['AI Sentiment', 'Count', 'Avg_Confidence']
+
+
+def month_label(year, month):
+    """(2023, 6) -> "June 2023" """
+    return f"{MONTH_NAMES[month - 1]} {year}"
+
+
+def month_bounds(year, month):
+    """Začetek meseca in začetek naslednjega (polodprt interval)"""
+    start = pd.Timestamp(year=year, month=month, day=1)
+    return start, start + pd.offsets.MonthBegin(1)
+
+
+def sentiment_counts(rows):
+    """Število in vsota zaupanja po oznaki (samo vrstice z oznako)"""
+    if rows.empty or 'AI Sentiment' not in rows:
+        return pd.DataFrame(columns=['Count', 'Confidence_Sum'], index=pd.Index([], name='AI Sentiment'))
+    labelled = rows[rows['AI Sentiment'].notna()]
+    return labelled.groupby('AI Sentiment').agg(
+        Count=('AI Sentiment', 'size'),
+        Confidence_Sum=('AI Confidence', 'sum')
+    )
+
+
+def combine_sentiment(parts):
+    """Sešteje delne števce sentiment_counts() v podatke za graf"""
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=SENTIMENT_COLUMNS)
+    totals = pd.concat(parts).groupby(level=0).sum()
+    totals.index.name = 'AI Sentiment'
+    totals['Avg_Confidence'] = totals['Confidence_Sum'] / totals['Count']
+    return totals.reset_index()[SENTIMENT_COLUMNS]
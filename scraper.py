@@ -1,253 +1,431 @@
 import os
-import json
 import time
-import re
-import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+import argparse
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
 
-def count_stars(element):
-    """Prešteje SVG zvezdice"""
-    try:
-        stars = element.find_elements(By.XPATH, ".//*[local-name()='path' and @fill='#ffce31']")
-        return len(stars) if len(stars) > 0 else 5
-    except:
-        return 5
+from parsers import (parse_product, product_key, merge_product_pages, last_product_page,
+                     parse_review, parse_testimonial)
+from waits import Waiter, report_timings
+from pool import DriverPool
+from browser import create_driver, compare_profiles, PROFILES, PROFILE
+from state import ScrapeState, SECTIONS
+from sink import RecordSink
+from storage import Storage
+from metrics import Metrics, profile_stages
 
-def main():
-    print("="*60)
-    print("🚀 WEB SCRAPER")
-    print("="*60)
+BASE_URL = "https://web-scraping.dev"
+
+WORKERS = 3
+MAX_PAGES = 10
+MAX_CLICKS = 200
+MAX_SCROLLS = 100
+
+# Faze scrapa (page_load, extract, serialize ...) -> scraped_data/metrics/
+METRICS = Metrics("scraper")
+
+PRODUCT_SELECTOR = "div[class*='product']"
+REVIEW_SELECTOR = ".review"
+TESTIMONIAL_SELECTOR = "div[class*='testimonial']"
+
+# En JS klic na stanje strani: za vsak element vrne besedilo,
+# število zapolnjenih zvezdic in datum (namesto .text + find_elements za vsakega).
+# Z only_new se obdelani elementi označijo z data-scraped, tako da po
+# Load More / scrollu dobimo samo na novo dodane.
+EXTRACT_JS = """
+const [selector, onlyNew] = arguments;
+const nodes = document.querySelectorAll(onlyNew ? selector + ":not([data-scraped])" : selector);
+return Array.from(nodes, (n) => {
+    if (onlyNew) n.setAttribute("data-scraped", "1");
+    const dateEl = n.querySelector("[class*='date']");
+    return {
+        text: n.innerText || "",
+        stars: n.querySelectorAll("path[fill='#ffce31']").length,
+        date: dateEl ? (dateEl.innerText || "") : ""
+    };
+});
+"""
+
+def extract_nodes(driver, selector, only_new=False):
+    """Vrne seznam {"text", "stars", "date"} za elemente (en round-trip)"""
+    with METRICS.span("extract", selector=selector):
+        nodes = driver.execute_script(EXTRACT_JS, selector, only_new) or []
+    METRICS.inc("extracted_nodes_total", len(nodes), selector=selector)
+    return nodes
+
+def load_page(driver, waiter, url, selector, section):
+    """Odpre stran in počaka na prve elemente"""
+    with METRICS.span("page_load", section=section):
+        driver.get(url)
+        waiter.for_elements("page_load", selector)
+
+def emit(sink, state, section, record):
+    """Zapiše zapis v sink, če še ni znan ali že zapisan; vrne, ali je bil zapisan"""
+    if state is None or state.add(section, record):
+        sink.write(section, record)
+        METRICS.inc("records_total", section=section)
+        return True
+    METRICS.inc("known_records_total", section=section)
+    return False
+
+# ==========================================
+# 1. PRODUCTS
+# ==========================================
+def scrape_product_pages(driver, pages, base_url=BASE_URL, waiter=None):
+    """Prebere podane strani produktov -> {stran: [produkti]}, ustavi se na prvi prazni"""
+    waiter = waiter or Waiter(driver, metrics=METRICS)
+    pages_data = {}
     
-    # Nastavitve
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    data_folder = os.path.join(current_dir, 'scraped_data')
-    os.makedirs(data_folder, exist_ok=True)
+    for page in pages:
+        load_page(driver, waiter, f"{base_url}/products?page={page}", PRODUCT_SELECTOR, "products")
+        
+        products = []
+        for p in extract_nodes(driver, PRODUCT_SELECTOR):
+            product = parse_product(p['text'])
+            if product:
+                products.append(product)
+        
+        pages_data[page] = products
+        if not products:
+            break
     
-    # Zagon Chrome
-    print("\n⚙️  Zaganjam Chrome...")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()))
+    return pages_data
+
+def scrape_products(driver, base_url=BASE_URL, waiter=None):
+    """Produkti prek Selenium (fallback za HTTP način)"""
+    print("\n📦 PRODUCTS - Scraping...")
+    pages_data = scrape_product_pages(driver, range(1, MAX_PAGES + 1), base_url, waiter)
+    products_data = merge_product_pages(pages_data)
+    print(f"   ✅ Skupaj: {len(products_data)} products\n")
+    return products_data
+
+def scrape_products_http(base_url=BASE_URL, start_page=1):
+    """Strani produktov prek HTTP (brez brskalnika) -> {stran: [produkti]}"""
+    print("\n📦 PRODUCTS (HTTP) - Scraping...")
+    try:
+        # Brez aiohttp/lxml vrne prazno -> scrape_all preklopi na Selenium
+        import http_scraper
+        with METRICS.span("page_load", section="products", engine="http"):
+            return http_scraper.scrape_product_pages(base_url, start_page, MAX_PAGES)
+    except Exception as e:
+        print(f"   ⚠️  HTTP napaka: {e}")
+        return {}
+
+# ==========================================
+# 2. REVIEWS
+# ==========================================
+def scrape_reviews(driver, sink, base_url=BASE_URL, waiter=None, state=None):
+    """Reviews z Load More gumbom, sproti v sink; vrne število zapisov"""
+    print("⭐ REVIEWS - Scraping...")
+    waiter = waiter or Waiter(driver, metrics=METRICS)
+    total = 0
+    load_page(driver, waiter, f"{base_url}/reviews", REVIEW_SELECTOR, "reviews")
     
-    all_data = {
-        "products": [],
-        "reviews": [],
-        "testimonials": []
-    }
+    stop_scraping = False
+    clicks = 0
     
-    try:
-        # ==========================================
-        # 1. PRODUCTS
-        # ==========================================
-        print("\n📦 PRODUCTS - Scraping...")
-        seen_products = set()
-        page = 1
+    while not stop_scraping and clicks < MAX_CLICKS:
+        reviews = extract_nodes(driver, REVIEW_SELECTOR, only_new=True)
         
-        while page <= 10:
-            driver.get(f"https://web-scraping.dev/products?page={page}")
-            time.sleep(2)
-            
-            products = driver.find_elements(By.CSS_SELECTOR, "div[class*='product']")
-            
-            if not products:
-                print(f"   Stran {page}: Ni produktov")
-                break
-            
-            added = 0
-            for p in products:
-                try:
-                    text = p.text.strip()
-                    if not text or len(text) < 5:
-                        continue
-                    
-                    lines = text.split('\n')
-                    name = lines[0].strip()
-                    
-                    if len(name) < 3 or name.lower() in ['log in', 'sign up', 'products']:
-                        continue
-                    
-                    # Najdi ceno
-                    price = "$0.00"
-                    for line in lines:
-                        if '$' in line:
-                            match = re.search(r'\$\d+\.\d{2}', line)
-                            if match:
-                                price = match.group(0)
-                                break
-                    
-                    product_id = f"{name}_{price}"
-                    if product_id not in seen_products:
-                        seen_products.add(product_id)
-                        all_data["products"].append({
-                            "name": name,
-                            "price": price
-                        })
-                        added += 1
-                except:
+        added = 0
+        for r in reviews:
+            try:
+                review, year = parse_review(r)
+                
+                # Ustavi pri starih
+                if year > 0 and year < 2023:
+                    print(f"   ⛔ Najden review iz {year} - ustavljam")
+                    stop_scraping = True
+                    break
+                
+                if not review:
                     continue
-            
-            print(f"   Stran {page}: +{added} | Skupaj: {len(all_data['products'])}")
-            
-            if added == 0:
-                break
-            
-            page += 1
+                
+                # Inkrementalno: ustavi pri že shranjenih
+                if state and (state.is_known("reviews", review) or state.is_older("reviews", review["date"])):
+                    print("   ⏹️  Dosežen že znan review - ustavljam")
+                    stop_scraping = True
+                    break
+                
+                if emit(sink, state, "reviews", review):
+                    added += 1
+            except:
+                continue
         
-        print(f"   ✅ Skupaj: {len(all_data['products'])} products\n")
+        total += added
+        if added > 0:
+            print(f"   +{added} reviews | Skupaj: {total}")
         
-        # ==========================================
-        # 2. REVIEWS
-        # ==========================================
-        print("⭐ REVIEWS - Scraping...")
-        driver.get("https://web-scraping.dev/reviews")
-        time.sleep(3)
+        sink.flush()
         
-        seen_reviews = set()
-        stop_scraping = False
-        clicks = 0
+        if stop_scraping:
+            break
         
-        while not stop_scraping and clicks < 15:
-            reviews = driver.find_elements(By.CLASS_NAME, "review")
-            
-            added = 0
-            for r in reviews:
-                try:
-                    text = r.text.strip()
-                    if not text:
-                        continue
-                    
-                    lines = [l.strip() for l in text.split('\n') if l.strip()]
-                    
-                    # Najdi datum
-                    date_str = ""
-                    year = 0
-                    for line in lines:
-                        if re.search(r'20\d{2}', line):
-                            date_str = line
-                            year_match = re.search(r'(20\d{2})', line)
-                            if year_match:
-                                year = int(year_match.group(1))
-                            break
-                    
-                    # Ustavi pri starih
-                    if year > 0 and year < 2023:
-                        print(f"   ⛔ Najden review iz {year} - ustavljam")
-                        stop_scraping = True
-                        break
-                    
-                    if not date_str:
-                        continue
-                    
-                    # Review text (najdaljša vrstica)
-                    review_text = max(lines, key=len, default='')
-                    
-                    if len(review_text) < 10:
-                        continue
-                    
-                    rating = count_stars(r)
-                    
-                    review_id = f"{review_text[:30]}_{date_str}"
-                    if review_id not in seen_reviews:
-                        seen_reviews.add(review_id)
-                        all_data["reviews"].append({
-                            "date": date_str,
-                            "review_text": review_text,
-                            "rating": rating
-                        })
-                        added += 1
-                except:
-                    continue
-            
-            if added > 0:
-                print(f"   +{added} reviews | Skupaj: {len(all_data['reviews'])}")
+        # Klikni Load More
+        try:
+            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
             
-            if stop_scraping:
+            # Skrit gumb = ni več reviewov (brez čakanja); čakamo samo, če ga še ni
+            buttons = driver.find_elements(By.ID, "page-load-more")
+            if buttons and not buttons[0].is_displayed():
+                print("   Load More gumb je skrit - ni več reviewov")
                 break
+            load_btn = buttons[0] if buttons else waiter.for_visible("load_more", (By.ID, "page-load-more"))
+            if not load_btn:
+                print("   Load More gumb ni najden")
+                break
+            
+            previous = waiter.count(REVIEW_SELECTOR)
+            driver.execute_script("arguments[0].click();", load_btn)
+            clicks += 1
             
-            # Klikni Load More
+            # Čakaj na nove reviewe; na počasnem omrežju še na konec zahtevkov
+            if not waiter.for_count_growth("load_more", REVIEW_SELECTOR, previous):
+                waiter.for_network_idle()
+                if waiter.count(REVIEW_SELECTOR) <= previous:
+                    print("   Load More ni dodal reviewov - ustavljam")
+                    break
+        except:
+            print("   Load More gumb ni najden")
+            break
+    
+    print(f"   ✅ Skupaj: {total} reviews\n")
+    return total
+
+# ==========================================
+# 3. TESTIMONIALS
+# ==========================================
+def scrape_testimonials(driver, sink, base_url=BASE_URL, waiter=None, state=None):
+    """Testimonials z neskončnim scrollom, sproti v sink; vrne število zapisov"""
+    print("💬 TESTIMONIALS - Scraping...")
+    waiter = waiter or Waiter(driver, metrics=METRICS)
+    total = 0
+    load_page(driver, waiter, f"{base_url}/testimonials", TESTIMONIAL_SELECTOR, "testimonials")
+    
+    last_height = waiter.height()
+    scrolls = 0
+    
+    while True:
+        testimonials = extract_nodes(driver, TESTIMONIAL_SELECTOR, only_new=True)
+        
+        added = 0
+        parsed = 0
+        known = 0
+        for t in testimonials:
             try:
-                driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-                time.sleep(1)
+                testimonial = parse_testimonial(t)
+                if not testimonial:
+                    continue
                 
-                load_btn = driver.find_element(By.ID, "page-load-more")
-                if load_btn.is_displayed():
-                    driver.execute_script("arguments[0].click();", load_btn)
-                    clicks += 1
-                    time.sleep(2)
-                else:
-                    break
+                parsed += 1
+                if state and state.is_known("testimonials", testimonial):
+                    known += 1
+                
+                if emit(sink, state, "testimonials", testimonial):
+                    added += 1
             except:
-                print("   Load More gumb ni najden")
-                break
+                continue
         
-        print(f"   ✅ Skupaj: {len(all_data['reviews'])} reviews\n")
+        total += added
+        if added > 0:
+            print(f"   Scroll {scrolls}: +{added} | Skupaj: {total}")
         
-        # ==========================================
-        # 3. TESTIMONIALS
-        # ==========================================
-        print("💬 TESTIMONIALS - Scraping...")
-        driver.get("https://web-scraping.dev/testimonials")
-        time.sleep(3)
+        sink.flush()
         
-        seen_testimonials = set()
-        last_height = 0
-        scrolls = 0
+        # Inkrementalno: cel scroll samo že shranjenih -> naprej je vse znano
+        if state and parsed > 0 and known == parsed:
+            print("   ⏹️  Samo že znani testimonials - ustavljam")
+            break
         
-        while scrolls < 10:
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(2)
-            
-            new_height = driver.execute_script("return document.body.scrollHeight")
-            
-            testimonials = driver.find_elements(By.XPATH, "//div[contains(@class, 'testimonial')]")
-            
-            added = 0
-            for t in testimonials:
-                try:
-                    text = t.text.strip()
-                    
-                    if not text or len(text) < 10 or len(text) > 400:
-                        continue
-                    
-                    if any(word in text.lower() for word in ['take a look', 'collection', 'navigation']):
-                        continue
-                    
-                    clean_text = ' '.join(text.split())
-                    
-                    if clean_text not in seen_testimonials:
-                        seen_testimonials.add(clean_text)
-                        rating = count_stars(t)
-                        all_data["testimonials"].append({
-                            "text": clean_text,
-                            "rating": rating
-                        })
-                        added += 1
-                except:
-                    continue
-            
-            if added > 0:
-                print(f"   Scroll {scrolls+1}: +{added} | Skupaj: {len(all_data['testimonials'])}")
-            
-            if new_height == last_height:
-                print("   Ni več vsebine")
-                break
-            
-            last_height = new_height
-            scrolls += 1
+        if scrolls >= MAX_SCROLLS:
+            break
         
-        print(f"   ✅ Skupaj: {len(all_data['testimonials'])} testimonials\n")
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        if not waiter.for_height_change("scroll", last_height):
+            print("   Ni več vsebine")
+            break
         
-    except Exception as e:
-        print(f"\n❌ NAPAKA: {e}")
-        import traceback
-        traceback.print_exc()
+        last_height = waiter.height()
+        scrolls += 1
     
+    print(f"   ✅ Skupaj: {total} testimonials\n")
+    return total
+
+# ==========================================
+# PRIMERJAVA HITROSTI
+# ==========================================
+def compare_engines(base_url=BASE_URL, browser=PROFILE):
+    """Izmeri čas products scrapanja: HTTP proti Selenium"""
+    print("\n⏱️  PRIMERJAVA: HTTP vs Selenium (products)")
+    
+    start = time.perf_counter()
+    http_products = merge_product_pages(scrape_products_http(base_url))
+    http_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    driver = create_driver(browser)
+    try:
+        selenium_products = scrape_products(driver, base_url)
     finally:
         driver.quit()
-        print("\n🔒 Brskalnik zaprt")
+    selenium_time = time.perf_counter() - start
+    
+    print("="*60)
+    print(f"HTTP:     {http_time:6.2f}s | {len(http_products)} products")
+    print(f"Selenium: {selenium_time:6.2f}s | {len(selenium_products)} products")
+    if http_time > 0:
+        print(f"Pohitritev: {selenium_time / http_time:.1f}x")
+    same = [product_key(p) for p in http_products] == [product_key(p) for p in selenium_products]
+    print(f"Enaki zapisi: {'✅' if same else '❌'}")
+    print("="*60)
+
+def compare_browsers(base_url=BASE_URL, repeats=3):
+    """Izmeri nalaganje strani in RSS: lean profil proti privzetemu Chromu"""
+    compare_profiles([
+        ("products", f"{base_url}/products?page=1", PRODUCT_SELECTOR),
+        ("reviews", f"{base_url}/reviews", REVIEW_SELECTOR),
+        ("testimonials", f"{base_url}/testimonials", TESTIMONIAL_SELECTOR),
+    ], repeats)
+
+# ==========================================
+# VZPOREDNO SCRAPANJE
+# ==========================================
+def run_section(pool, name, scrape, *args, **kwargs):
+    """Izvede sekcijo na brskalniku iz bazena in izmeri čas"""
+    start = time.perf_counter()
+    with METRICS.span("section", section=name.split()[0]), pool.acquire() as driver:
+        waiter = Waiter(driver, metrics=METRICS)
+        data = scrape(driver, *args, waiter=waiter, **kwargs)
+    return {"name": name, "data": data, "seconds": time.perf_counter() - start, "timings": waiter.timings}
+
+def run_http_products(base_url, start_page=1):
+    """HTTP products (brez brskalnika) z merjenjem časa"""
+    start = time.perf_counter()
+    data = scrape_products_http(base_url, start_page)
+    return {"name": "products (http)", "data": data, "seconds": time.perf_counter() - start, "timings": []}
+
+def submit_product_pages(executor, pool, base_url, workers, start_page=1):
+    """Razdeli strani produktov med workerje (1, 4, 7 ... / 2, 5, 8 ...)"""
+    print("\n📦 PRODUCTS - Scraping...")
+    futures = []
+    for i in range(min(workers, MAX_PAGES - start_page + 1)):
+        pages = list(range(start_page + i, MAX_PAGES + 1, workers))
+        name = f"products {pages[0]}..{pages[-1]}/{workers}"
+        futures.append(executor.submit(run_section, pool, name, scrape_product_pages, pages, base_url))
+    return futures
+
+def scrape_all(sink, engine="http", base_url=BASE_URL, workers=WORKERS, state=None, browser=PROFILE):
+    """Products, reviews in testimonials vzporedno, vsak na svojem brskalniku iz bazena.
+    
+    Zapisi gredo sproti v `sink`; vrne število zapisanih zapisov po sekcijah.
+    `state` prepreči ponovni zapis istega zapisa; z inkrementalnim stanjem
+    (znani zapisi in marki) se products začnejo na zadnji znani strani,
+    reviews in testimonials pa se ustavijo pri že shranjenih zapisih.
+    Brskalnik (profil `browser`) se v bazenu ponovno uporabi med sekcijami.
+    """
+    counts = {
+        "products": 0,
+        "reviews": 0,
+        "testimonials": 0
+    }
+    results = []
+    product_pages = {}
+    start_page = state.get_mark("products", 1) if state else 1
+    
+    print(f"\n⚙️  Zaganjam do {workers} Chrome brskalnikov ({browser})...")
+    pool = DriverPool(partial(create_driver, browser), workers)
+    # +1 nit za HTTP products, ki ne zasede brskalnika
+    executor = ThreadPoolExecutor(max_workers=workers + 1)
+    
+    try:
+        # Products najprej prek HTTP - brskalnik rabimo samo za JS strani
+        if engine == "http":
+            pending = {executor.submit(run_http_products, base_url, start_page)}
+        else:
+            pending = set(submit_product_pages(executor, pool, base_url, workers, start_page))
+        pending.add(executor.submit(run_section, pool, "reviews", scrape_reviews, sink, base_url, state=state))
+        pending.add(executor.submit(run_section, pool, "testimonials", scrape_testimonials, sink, base_url, state=state))
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"\n❌ NAPAKA: {e}")
+                    import traceback
+                    traceback.print_exc()
+                    continue
+                
+                results.append(result)
+                name = result["name"]
+                if name == "products (http)":
+                    product_pages.update(result["data"])
+                    if not last_product_page(result["data"]):
+                        print("   ⚠️  HTTP ni vrnil produktov - fallback na Selenium")
+                        pending.update(submit_product_pages(executor, pool, base_url, workers, start_page))
+                elif name.startswith("products"):
+                    product_pages.update(result["data"])
+                else:
+                    counts[name] = result["data"]
+    
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        closed = pool.close()
+        print(f"\n🔒 Brskalniki zaprti ({closed})")
+    
+    if product_pages:
+        with METRICS.span("dedup", section="products"):
+            products = merge_product_pages(product_pages)
+        METRICS.inc("duplicates_total", sum(len(p) for p in product_pages.values()) - len(products),
+                    section="products")
+        counts["products"] = sum(emit(sink, state, "products", product) for product in products)
+        print(f"   ✅ Skupaj: {counts['products']} products\n")
+        if state:
+            state.set_mark("products", max(start_page, last_product_page(product_pages)))
+    
+    print("\n⏱️  WORKERJI")
+    for result in results:
+        data = result["data"]
+        count = sum(len(p) for p in data.values()) if isinstance(data, dict) else data
+        print(f"   {result['name']:<22} {result['seconds']:6.2f}s | {count} zapisov")
+    report_timings([t for result in results for t in result["timings"]])
+    
+    return counts
+
+def main(engine="http", base_url=BASE_URL, workers=WORKERS, incremental=False, metrics_folder=None,
+         browser=PROFILE):
+    print("="*60)
+    print("🚀 WEB SCRAPER")
+    print("="*60)
+    
+    # Nastavitve
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    data_folder = os.path.join(current_dir, 'scraped_data')
+    os.makedirs(data_folder, exist_ok=True)
+    
+    # Baza je vir podatkov; ob prvem zagonu uvozi obstoječe JSON poglede
+    storage = Storage.open(data_folder)
+    for section, rows in storage.sync_views(data_folder).items():
+        print(f"✓ {section.capitalize()}: {rows} vrstic uvoženih v bazo")
+    # Znane zapise pove baza; stanje hrani samo marke
+    state = ScrapeState.load(data_folder, storage)
+    # Zapisi gredo sproti v JSONL; v inkrementalnem načinu ostanejo tisti iz prekinjenega zagona
+    sink = RecordSink(data_folder, resume=incremental)
+    if incremental:
+        for section in SECTIONS:
+            state.resume(section, sink.iter_records(section))
+        resumed = sink.counts()
+        if any(resumed.values()):
+            print(f"\n♻️  Nadaljujem prekinjen zagon: {resumed}")
+    
+    try:
+        # Polni zagon: prazno stanje samo za ta zagon, da isti zapis ne gre dvakrat v JSONL
+        run_state = state if incremental else ScrapeState(state.path)
+        counts = scrape_all(sink, engine, base_url, workers, run_state, browser)
+    finally:
+        sink.close()
     
     # ==========================================
     # SHRANJEVANJE
@@ -256,35 +434,85 @@ def main():
     print("💾 SHRANJEVANJE...")
     print("="*60)
     
-    # Products
-    if all_data["products"]:
-        df = pd.DataFrame(all_data["products"])
-        df.to_json(os.path.join(data_folder, 'products.json'), orient='records', indent=4)
-        df.to_csv(os.path.join(data_folder, 'products.csv'), index=False)
-        print(f"✓ Products: {len(all_data['products'])}")
+    sink_counts = sink.counts()
+    for section in SECTIONS:
+        new_records = sink_counts[section]
+        if not new_records and not incremental:
+            continue
+        if new_records:
+            # Bulk upsert: polni zagon zamenja sekcijo, inkrementalni doda nove
+            with METRICS.span("upsert", section=section):
+                added = storage.upsert(section, sink.iter_records(section), replace=not incremental)
+            METRICS.inc("duplicates_total", new_records - added, section=section)
+            with METRICS.span("serialize", section=section):
+                storage.export_views(data_folder, section)
+        if incremental:
+            # Samo novi zapisi (vključno s tistimi iz prekinjenega zagona)
+            state.commit(section, sink.iter_records(section))
+            print(f"✓ {section.capitalize()}: +{new_records} novih")
+        else:
+            state.reset(section, sink.iter_records(section))
+            print(f"✓ {section.capitalize()}: {added} ({new_records - added} duplikatov)")
+    with METRICS.span("state_save"):
+        state.save()
     
-    # Reviews
-    if all_data["reviews"]:
-        df = pd.DataFrame(all_data["reviews"])
-        df.to_json(os.path.join(data_folder, 'reviews.json'), orient='records', indent=4)
-        df.to_csv(os.path.join(data_folder, 'reviews.csv'), index=False)
-        print(f"✓ Reviews: {len(all_data['reviews'])}")
-    
-    # Testimonials
-    if all_data["testimonials"]:
-        df = pd.DataFrame(all_data["testimonials"])
-        df.to_json(os.path.join(data_folder, 'testimonials.json'), orient='records', indent=4)
-        df.to_csv(os.path.join(data_folder, 'testimonials.csv'), index=False)
-        print(f"✓ Testimonials: {len(all_data['testimonials'])}")
+    # Tipizirani pogledi (za memory-mapped branje) po JSON, da niso starejši od njega
+    with METRICS.span("columnar"):
+        for section in [s for s in SECTIONS if sink_counts[s]]:
+            rows = storage.export_columnar(data_folder, section)
+            if rows is None:
+                print("⚠️  pyarrow ni nameščen - preskakujem .arrow/.parquet")
+                break
+            print(f"✓ {section.capitalize()}: {rows} vrstic v .arrow/.parquet")
+    storage.close()
+    for section in SECTIONS:
+        sink.discard(section)
     
     print("\n" + "="*60)
     print("📊 POVZETEK")
     print("="*60)
-    print(f"Products:     {len(all_data['products'])}")
-    print(f"Reviews:      {len(all_data['reviews'])}")
-    print(f"Testimonials: {len(all_data['testimonials'])}")
+    print(f"Products:     {counts['products']}")
+    print(f"Reviews:      {counts['reviews']}")
+    print(f"Testimonials: {counts['testimonials']}")
+    METRICS.summary()
+    report_path = METRICS.write_report(metrics_folder or os.path.join(data_folder, 'metrics'))
     print(f"\n📁 {data_folder}/")
+    print(f"📈 {report_path} (+ .prom)")
     print("\n✅ KONČANO!\n")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Web scraper za web-scraping.dev")
+    parser.add_argument("--engine", choices=["http", "selenium"], default="http",
+                        help="način za products (http = brez brskalnika, selenium = fallback)")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="osnovni URL (npr. lokalni strežnik s posnetimi stranmi)")
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="število vzporednih brskalnikov")
+    parser.add_argument("--incremental", action="store_true",
+                        help="samo nove vsebine od zadnjega zagona (z nadaljevanjem prekinjenega)")
+    parser.add_argument("--enrich", action="store_true",
+                        help="po scrapanju doda AI sentiment v reviews (python sentiment.py)")
+    parser.add_argument("--compare", action="store_true",
+                        help="samo izmeri HTTP vs Selenium za products")
+    parser.add_argument("--browser", choices=PROFILES, default=PROFILE,
+                        help="profil Chroma (lean = headless brez slik, pisav in analitike)")
+    parser.add_argument("--compare-browser", action="store_true",
+                        help="samo izmeri nalaganje strani in RSS: lean vs default Chrome")
+    parser.add_argument("--metrics-out",
+                        help="mapa za JSON/Prometheus poročilo (privzeto scraped_data/metrics)")
+    parser.add_argument("--profile",
+                        help="faze za cProfile, npr. extract,serialize ali * (tudi METRICS_PROFILE)")
+    args = parser.parse_args()
+    if args.profile:
+        METRICS.profile = profile_stages(args.profile)
+    
+    if args.compare:
+        compare_engines(args.base_url, args.browser)
+    elif args.compare_browser:
+        compare_browsers(args.base_url)
+    else:
+        main(engine=args.engine, base_url=args.base_url, workers=args.workers,
+             incremental=args.incremental, metrics_folder=args.metrics_out, browser=args.browser)
+        if args.enrich:
+            from sentiment import enrich_reviews
+            enrich_reviews(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scraped_data'))
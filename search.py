@@ -0,0 +1,131 @@
+import re
+import bisect
+from difflib import SequenceMatcher
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from parsers import parse_price
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Točke ujemanja besede iz poizvedbe z besedo v imenu
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.8
+SUBSTRING_SCORE = 0.6
+FUZZY_SCORE = 0.5         # × podobnost
+FUZZY_RATIO = 0.75        # najmanjša podobnost (difflib) za tipkarske napake
+FUZZY_CANDIDATES = 50     # besed z največ skupnimi trigrami, ki se preverijo
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class ProductIndex:
+    """Iskalni indeks produktov, zgrajen enkrat ob nalaganju podatkov.
+
+    Obrnjeni indeks beseda -> produkti in trigramski indeks nad besednjakom
+    (ne nad produkti), zato je poizvedba odvisna od velikosti besednjaka
+    in zadetkov, ne od števila produktov.
+    """
+
+    def __init__(self, names, prices):
+        self.names = [str(n) for n in names]
+        self.prices = np.array([np.nan if p is None else p for p in map(parse_price, prices)], dtype='float64')
+
+        postings = defaultdict(list)
+        for i, name in enumerate(self.names):
+            for token in set(tokenize(name)):
+                postings[token].append(i)
+        self.postings = {token: np.array(ids, dtype='int32') for token, ids in postings.items()}
+        self.vocabulary = sorted(self.postings)
+
+        self.trigrams = defaultdict(list)
+        for token in self.vocabulary:
+            for gram in trigrams(token):
+                self.trigrams[gram].append(token)
+
+    @classmethod
+    def from_frame(cls, products):
+        if products.empty:
+            return cls([], [])
+        prices = products['price'] if 'price' in products else [None] * len(products)
+        return cls(products['name'].tolist(), list(prices))
+
+    def __len__(self):
+        return len(self.names)
+
+    # ==========================================
+    # UJEMANJE BESED
+    # ==========================================
+    def match_term(self, term):
+        """Besede iz besednjaka, ki ustrezajo besedi poizvedbe -> {beseda: točke}"""
+        matches = {}
+        if term in self.postings:
+            matches[term] = EXACT_SCORE
+
+        # Predpona: zaporedne besede v urejenem besednjaku
+        i = bisect.bisect_left(self.vocabulary, term)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(term):
+            matches.setdefault(self.vocabulary[i], PREFIX_SCORE)
+            i += 1
+
+        grams = trigrams(term)
+        if not grams:
+            return matches
+
+        # Podniz: besede, ki imajo vse trigrame poizvedbe
+        shared = Counter(token for gram in grams for token in self.trigrams.get(gram, ()))
+        for token, count in shared.items():
+            if count == len(grams) and term in token:
+                matches.setdefault(token, SUBSTRING_SCORE)
+
+        # Tipkarske napake: preveri samo besede z največ skupnimi trigrami
+        if not matches:
+            for token, _ in shared.most_common(FUZZY_CANDIDATES):
+                ratio = SequenceMatcher(None, term, token).ratio()
+                if ratio >= FUZZY_RATIO:
+                    matches[token] = FUZZY_SCORE * ratio
+        return matches
+
+    # ==========================================
+    # ISKANJE
+    # ==========================================
+    def search(self, query='', min_price=None, max_price=None, limit=None):
+        """Pozicije produktov, razvrščene po ujemanju; vse besede poizvedbe morajo ustrezati"""
+        terms = tokenize(query)
+        if terms:
+            scores = None
+            for term in terms:
+                term_scores = {}
+                for token, score in self.match_term(term).items():
+                    for i in self.postings[token].tolist():
+                        if score > term_scores.get(i, 0):
+                            term_scores[i] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {i: s + term_scores[i] for i, s in scores.items() if i in term_scores}
+                if not scores:
+                    return []
+            # Boljše ujemanje prej, nato krajše ime, nato prvotni vrstni red
+            ids = sorted(scores, key=lambda i: (-scores[i], len(self.names[i]), i))
+            ids = np.array(ids, dtype='int64')
+        else:
+            ids = np.arange(len(self.names))
+
+        if min_price is not None or max_price is not None:
+            prices = self.prices[ids]
+            keep = ~np.isnan(prices)
+            if min_price is not None:
+                keep &= prices >= min_price
+            if max_price is not None:
+                keep &= prices <= max_price
+            ids = ids[keep]
+
+        return ids[:limit].tolist() if limit else ids.tolist()
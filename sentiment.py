@@ -0,0 +1,411 @@
+import os
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from itertools import repeat
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+MODEL_ID = "distilbert-base-uncased-finetuned-sst-2-english"
+CACHE_FILE = "sentiment_cache.sqlite"
+MAX_ENTRIES = 200_000    # največ zapisov v SQLite, potem se brišejo najdlje neuporabljeni
+LRU_SIZE = 20_000        # zapisov v pomnilniku
+BATCH_SIZE = 32
+MAX_LENGTH = 512         # tokenov (omejitev DistilBERT)
+SHARD_SIZE = 256         # besedil na opravilo v process poolu
+
+# pipeline = privzeti transformers pipeline (referenca), pytorch = isti model z
+# batchi po dolžini, quantized = dinamična int8 kvantizacija, onnx = onnxruntime
+BACKENDS = ["pipeline", "pytorch", "quantized", "onnx"]
+BACKEND = os.environ.get("SENTIMENT_BACKEND", "pytorch")
+
+
+def cache_path():
+    """Pot do cache datoteke (SENTIMENT_CACHE_PATH za trajni disk na Renderju)"""
+    from paths import find_data_folder
+    return os.environ.get("SENTIMENT_CACHE_PATH") or os.path.join(find_data_folder(), CACHE_FILE)
+
+
+def model_key(backend=BACKEND, model_id=MODEL_ID):
+    """ID za cache: kvantiziran/ONNX model ima lahko malenkost drugačne ocene"""
+    return model_id if backend in ("pipeline", "pytorch") else f"{model_id}+{backend}"
+
+
+def text_key(text, model_id=MODEL_ID):
+    """Ključ = hash modela in besedila"""
+    return hashlib.sha1(f"{model_id}\0{text}".encode('utf-8')).hexdigest()
+
+
+class SentimentCache:
+    """Trajni cache rezultatov sentimenta (SQLite) z LRU v pomnilniku"""
+
+    def __init__(self, path, model_id=MODEL_ID, max_entries=MAX_ENTRIES, lru_size=LRU_SIZE):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.lru_size = lru_size
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sentiment ("
+            " key TEXT PRIMARY KEY, label TEXT NOT NULL, score REAL NOT NULL, last_used INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS sentiment_last_used ON sentiment(last_used)")
+        self._db.commit()
+
+    def _remember(self, key, value):
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    def get_many(self, keys):
+        """Vrne {ključ: {"label", "score"}} za ključe, ki so v cacheu"""
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[key] = self._lru[key]
+                else:
+                    missing.append(key)
+
+            # SQLite ima omejitev števila parametrov - beri po kosih
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                rows = self._db.execute(
+                    f"SELECT key, label, score FROM sentiment WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk
+                ).fetchall()
+                for key, label, score in rows:
+                    value = {"label": label, "score": score}
+                    found[key] = value
+                    self._remember(key, value)
+
+            # Tudi zadetki iz LRU so uporabljeni - sicer bi jih eviction štel za stare
+            if found:
+                now = int(time.time())
+                self._db.executemany(
+                    "UPDATE sentiment SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._db.commit()
+        return found
+
+    def put_many(self, items):
+        """Shrani {ključ: {"label", "score"}} in po potrebi odstrani najstarejše"""
+        if not items:
+            return
+        now = int(time.time())
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO sentiment (key, label, score, last_used) VALUES (?, ?, ?, ?)",
+                [(key, r["label"], float(r["score"]), now) for key, r in items.items()]
+            )
+            for key, value in items.items():
+                self._remember(key, value)
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        count = self._db.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+        excess = count - self.max_entries
+        if excess > 0:
+            self._db.execute(
+                "DELETE FROM sentiment WHERE key IN (SELECT key FROM sentiment ORDER BY last_used LIMIT ?)",
+                (excess,)
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+
+
+# ==========================================
+# INFERENCA
+# ==========================================
+class SentimentModel:
+    """Tokenizer + model z vmesnikom kot pipeline: besedila -> [{"label", "score"}].
+
+    Besedila se razvrstijo po dolžini, da je v batchu čim manj paddinga,
+    in se vedno odrežejo na MAX_LENGTH tokenov.
+    """
+
+    def __init__(self, backend="pytorch", model_id=MODEL_ID, threads=None,
+                 batch_size=BATCH_SIZE, max_length=MAX_LENGTH):
+        import torch
+        from transformers import AutoTokenizer
+
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_length = max_length
+        threads = threads or os.cpu_count() or 1
+        torch.set_num_threads(threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+
+        if backend == "onnx":
+            import onnxruntime as ort
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+            self.model = ORTModelForSequenceClassification.from_pretrained(
+                model_id, export=True, session_options=options
+            )
+        else:
+            from transformers import AutoModelForSequenceClassification
+            model = AutoModelForSequenceClassification.from_pretrained(model_id).eval()
+            if backend == "quantized":
+                model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self.model = model
+        self.labels = self.model.config.id2label
+
+    def __call__(self, texts, batch_size=None):
+        import torch
+
+        batch_size = batch_size or self.batch_size
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        results = [None] * len(texts)
+
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            encoded = self.tokenizer(
+                [texts[i] for i in batch], padding=True, truncation=True,
+                max_length=self.max_length, return_tensors="pt"
+            )
+            with torch.inference_mode():
+                logits = self.model(**encoded).logits
+            scores, labels = torch.softmax(logits.float(), dim=-1).max(dim=-1)
+            for i, score, label in zip(batch, scores.tolist(), labels.tolist()):
+                results[i] = {"label": self.labels[label], "score": score}
+        return results
+
+
+def load_model(backend=BACKEND, threads=None, model_id=MODEL_ID):
+    """Naloži model za izbrani backend; vsi imajo isti vmesnik model(texts, batch_size)"""
+    if backend not in BACKENDS:
+        raise ValueError(f"Neznan backend: {backend} (možni: {', '.join(BACKENDS)})")
+
+    if backend == "pipeline":
+        from transformers import pipeline
+        pipe = pipeline("sentiment-analysis", model=model_id)
+
+        def predict(texts, batch_size=BATCH_SIZE):
+            results = pipe(texts, batch_size=batch_size, truncation=True, max_length=MAX_LENGTH)
+            return [{"label": r["label"], "score": float(r["score"])} for r in results]
+
+        return predict
+
+    return SentimentModel(backend, model_id, threads)
+
+
+class ModelWarmup:
+    """Naloži model v ozadju, da prvi obisk strani z AI ne čaka na prenos/load.
+
+    state: "loading" -> "ready" ali "failed" (napaka je v `error`).
+    """
+
+    def __init__(self, backend=BACKEND, threads=None):
+        self.backend = backend
+        self.threads = threads
+        self.state = "loading"
+        self.error = None
+        self.seconds = None
+        self._model = None
+        self._started = time.perf_counter()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._load, name="sentiment-warmup", daemon=True)
+        self._thread.start()
+
+    def _load(self):
+        try:
+            self._model = load_model(self.backend, self.threads)
+            self.state = "ready"
+        except Exception as e:
+            self.error = e
+            self.state = "failed"
+        finally:
+            self.seconds = time.perf_counter() - self._started
+            self._done.set()
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def elapsed(self):
+        """Sekunde od začetka nalaganja (oz. trajanje, ko je končano)"""
+        return self.seconds if self._done.is_set() else time.perf_counter() - self._started
+
+    def get(self, timeout=None):
+        """Počaka na model; ob napaki jo ponovno sproži, ob timeoutu TimeoutError"""
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Model se še nalaga ({self.elapsed():.0f}s)")
+        if self.error is not None:
+            raise self.error
+        return self._model
+
+
+def check_parity(texts, backend, reference="pipeline", threads=None):
+    """Primerja backend z referenco: ujemanje oznak, razlika ocen in hitrost"""
+    report = {}
+    outputs = {}
+    for name in (reference, backend):
+        model = load_model(name, threads)
+        start = time.perf_counter()
+        outputs[name] = model(texts)
+        elapsed = time.perf_counter() - start
+        report[name] = {"seconds": round(elapsed, 3), "per_second": round(len(texts) / max(elapsed, 1e-9), 1)}
+
+    pairs = list(zip(outputs[reference], outputs[backend]))
+    report["label_agreement"] = sum(a["label"] == b["label"] for a, b in pairs) / max(len(pairs), 1)
+    report["max_score_diff"] = max((abs(a["score"] - b["score"]) for a, b in pairs), default=0.0)
+
+    print(f"🔬 PARITY: {backend} vs {reference} ({len(texts)} besedil)")
+    for name in (reference, backend):
+        print(f"   {name:<10} {report[name]['seconds']:7.2f}s | {report[name]['per_second']:8.1f}/s")
+    print(f"   Ujemanje oznak: {report['label_agreement']:.2%} | max razlika ocene: {report['max_score_diff']:.4f}")
+    return report
+
+
+def analyze(texts, load_model, cache):
+    """Sentiment za seznam besedil; model (load_model()) dobi samo tiste, ki niso v cacheu"""
+    keys = [text_key(text, cache.model_id) for text in texts]
+    results = cache.get_many(keys)
+
+    misses = {}
+    for key, text in zip(keys, texts):
+        if key not in results:
+            misses.setdefault(key, text)
+
+    if misses:
+        predictions = load_model()(list(misses.values()))
+        computed = {
+            key: {"label": p["label"], "score": float(p["score"])}
+            for key, p in zip(misses, predictions)
+        }
+        cache.put_many(computed)
+        results.update(computed)
+
+    return [results[key] for key in keys]
+
+
+# ==========================================
+# PRIKAZ: PREDIZRAČUNANI + LIVE ZA MANJKAJOČE
+# ==========================================
+def missing_sentiment(reviews):
+    """Maska vrstic brez predizračunanega sentimenta"""
+    if 'AI Sentiment' not in reviews:
+        return np.ones(len(reviews), dtype=bool)
+    return reviews['AI Sentiment'].isna().to_numpy()
+
+
+def fill_sentiment(reviews, load_model, cache):
+    """Doda AI Sentiment / AI Confidence; live izračuna samo manjkajoče vrstice"""
+    missing = missing_sentiment(reviews)
+    if 'AI Sentiment' not in reviews:
+        reviews['AI Sentiment'] = None
+        reviews['AI Confidence'] = float('nan')
+    if missing.any():
+        texts = reviews.loc[missing, 'review_text'].astype(str).tolist()
+        results = analyze(texts, load_model, cache)
+        reviews.loc[missing, 'AI Sentiment'] = [r['label'] for r in results]
+        reviews.loc[missing, 'AI Confidence'] = [r['score'] for r in results]
+    return int(missing.sum())
+
+
+# ==========================================
+# OFFLINE OBOGATITEV (po scraper.main())
+# ==========================================
+_worker_pipeline = None
+
+
+def _init_worker(backend, threads):
+    """Vsak proces naloži svoj model z omejenim številom niti"""
+    global _worker_pipeline
+    _worker_pipeline = load_model(backend, threads)
+
+
+def _predict_shard(texts, batch_size):
+    return _worker_pipeline(texts, batch_size=batch_size)
+
+
+def sharded_predictor(workers, batch_size=BATCH_SIZE, backend=BACKEND, shard_size=SHARD_SIZE):
+    """Vrne funkcijo, ki besedila razdeli med `workers` procesov"""
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    def predict(texts):
+        shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+        if workers == 1:
+            _init_worker(backend, threads)
+            return [r for shard in shards for r in _predict_shard(shard, batch_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(backend, threads)) as executor:
+            return [r for shard in executor.map(_predict_shard, shards, repeat(batch_size)) for r in shard]
+
+    return predict
+
+
+def enrich_reviews(data_folder=None, workers=None, batch_size=BATCH_SIZE, force=False, backend=BACKEND):
+    """Doda AI Sentiment in AI Confidence v reviews.json/.csv, bazo in .arrow; vrne št. obdelanih"""
+    from paths import find_data_folder
+    from sink import iter_json, write_json_array, write_csv
+
+    data_folder = data_folder or find_data_folder()
+    workers = workers or max(1, min(4, os.cpu_count() or 1))
+    json_path = os.path.join(data_folder, 'reviews.json')
+
+    reviews = iter_json(json_path)
+    todo = [r for r in reviews if force or r.get('AI Sentiment') is None]
+    print(f"🤖 SENTIMENT: {len(todo)}/{len(reviews)} reviewov brez oznake")
+    if not todo:
+        return 0
+
+    start = time.perf_counter()
+    cache = SentimentCache(cache_path(), model_id=model_key(backend))
+    texts = [str(r.get('review_text', '')) for r in todo]
+    results = analyze(texts, lambda: sharded_predictor(workers, batch_size, backend), cache)
+    for review, result in zip(todo, results):
+        review['AI Sentiment'] = result['label']
+        review['AI Confidence'] = result['score']
+
+    write_json_array(json_path, reviews)
+    write_csv(os.path.join(data_folder, 'reviews.csv'), reviews)
+    # Oznake v bazo, nato tipiziran pogled iz nje (novejši od JSON)
+    from storage import Storage
+    storage = Storage.open(data_folder)
+    try:
+        storage.sync_views(data_folder)
+        storage.export_columnar(data_folder, 'reviews')
+    finally:
+        storage.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"✓ {len(todo)} reviewov v {elapsed:.1f}s ({len(todo) / max(elapsed, 1e-9):.0f}/s, {workers} procesov)")
+    return len(todo)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline sentiment za scraped reviews")
+    parser.add_argument("--data-folder", default=None)
+    parser.add_argument("--workers", type=int, default=None, help="število procesov")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--force", action="store_true", help="ponovno oceni tudi že označene")
+    parser.add_argument("--backend", choices=BACKENDS, default=BACKEND)
+    parser.add_argument("--parity", action="store_true",
+                        help="samo primerjaj --backend s privzetim pipeline na reviews.json")
+    args = parser.parse_args()
+
+    if args.parity:
+        from paths import find_data_folder
+        from sink import iter_json
+        reviews = iter_json(os.path.join(args.data_folder or find_data_folder(), 'reviews.json'))
+        check_parity([str(r.get('review_text', '')) for r in reviews], args.backend)
+    else:
+        enrich_reviews(args.data_folder, args.workers, args.batch_size, args.force, args.backend)
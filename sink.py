@@ -0,0 +1,154 @@
+import os
+import csv
+import json
+import time
+import threading
+
+from state import SECTIONS
+
+FLUSH_EVERY = 50      # zapisov med dvema flush
+FSYNC_EVERY = 5.0     # sekund med dvema fsync
+
+
+def iter_jsonl(path):
+    """Bere zapise iz JSON Lines; nepopolno zadnjo vrstico (po crashu) preskoči"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def iter_json(path):
+    """Zapisi iz obstoječega JSON pogleda"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def write_json_array(path, records):
+    """Zapiše JSON array sproti (isti format kot prej pandas orient='records', indent=4)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, record in enumerate(records):
+            if i:
+                f.write(',')
+            body = json.dumps(record, indent=4, separators=(',', ':'))
+            f.write('\n    ' + body.replace('\n', '\n    '))
+        f.write('\n]')
+    os.replace(tmp_path, path)
+
+
+def write_csv(path, records):
+    """Zapiše CSV sproti (glava iz ključev prvega zapisa)"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = None
+        for record in records:
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(record), extrasaction='ignore')
+                writer.writeheader()
+            writer.writerow(record)
+
+
+class RecordSink:
+    """Append-only JSON Lines zapis vsakega zapisa takoj, ko je najden.
+
+    Vsaka sekcija ima svojo `{section}.jsonl` datoteko z zapisi, ki še niso
+    v bazi (Storage.upsert jih prebere prek iter_records()).
+    Ob `resume=True` ostanejo zapisi prekinjenega zagona in se nadaljuje.
+    """
+
+    def __init__(self, data_folder, resume=False, flush_every=FLUSH_EVERY, fsync_every=FSYNC_EVERY):
+        self.data_folder = data_folder
+        self.flush_every = flush_every
+        self.fsync_every = fsync_every
+        self._files = {}
+        self._counts = {}
+        self._unflushed = {}
+        self._last_fsync = time.monotonic()
+        self._lock = threading.Lock()
+
+        for section in SECTIONS:
+            path = self.path(section)
+            if not resume and os.path.exists(path):
+                os.remove(path)
+            self._counts[section] = sum(1 for _ in iter_jsonl(path))
+            self._unflushed[section] = 0
+
+    def path(self, section):
+        return os.path.join(self.data_folder, f'{section}.jsonl')
+
+    def _file(self, section):
+        f = self._files.get(section)
+        if f is None:
+            path = self.path(section)
+            # Po crashu je zadnja vrstica lahko nepopolna - začni v novi
+            needs_newline = False
+            if os.path.exists(path) and os.path.getsize(path) > 0:
+                with open(path, 'rb') as existing:
+                    existing.seek(-1, os.SEEK_END)
+                    needs_newline = existing.read(1) != b'\n'
+            f = open(path, 'a', encoding='utf-8')
+            if needs_newline:
+                f.write('\n')
+            self._files[section] = f
+        return f
+
+    # ==========================================
+    # PISANJE
+    # ==========================================
+    def write(self, section, record):
+        """Doda zapis na konec JSONL sekcije"""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            self._file(section).write(line)
+            self._counts[section] += 1
+            self._unflushed[section] += 1
+            if self._unflushed[section] >= self.flush_every:
+                self._flush_locked()
+
+    def flush(self, fsync=False):
+        """Izprazni bufferje; fsync na vsakih `fsync_every` sekund (ali takoj)"""
+        with self._lock:
+            self._flush_locked(fsync)
+
+    def _flush_locked(self, fsync=False):
+        do_fsync = fsync or time.monotonic() - self._last_fsync >= self.fsync_every
+        for section, f in self._files.items():
+            f.flush()
+            if do_fsync:
+                os.fsync(f.fileno())
+            self._unflushed[section] = 0
+        if do_fsync:
+            self._last_fsync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self._flush_locked(fsync=True)
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+
+    def count(self, section):
+        return self._counts[section]
+
+    def counts(self):
+        return dict(self._counts)
+
+    def iter_records(self, section):
+        return iter_jsonl(self.path(section))
+
+    def discard(self, section):
+        """Odstrani JSONL sekcije, ko so zapisi v bazi"""
+        path = self.path(section)
+        if os.path.exists(path):
+            os.remove(path)
+        self._counts[section] = 0
@@ -0,0 +1,124 @@
+import os
+import re
+import json
+import threading
+
+from parsers import product_key, review_key, testimonial_key
+
+SECTIONS = ["products", "reviews", "testimonials"]
+KEY_FUNCS = {
+    "products": product_key,
+    "reviews": review_key,
+    "testimonials": testimonial_key,
+}
+STATE_FILE = "scrape_state.json"
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+class ScrapeState:
+    """High-water marki med zagoni in ključi zapisov tega zagona.
+
+    Shranjeni zapisi so v bazi (`storage`): ali je zapis znan, pove
+    poizvedba po njenem UNIQUE indeksu, zato stanje ne hrani ključev
+    prejšnjih zagonov. `pending` so ključi novih zapisov tega (ali
+    prekinjenega prejšnjega) zagona, ki so zaenkrat samo v JSONL
+    datotekah sinka; v scrape_state.json gredo samo marki.
+    """
+
+    def __init__(self, path, data=None, storage=None):
+        data = data or {}
+        self.path = path
+        self.storage = storage
+        self.pending = {s: set() for s in SECTIONS}
+        self.marks = dict(data.get("marks", {}))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, data_folder, storage=None):
+        """Naloži marke; ob prvem zagonu mark reviewov vzame iz baze"""
+        path = os.path.join(data_folder, STATE_FILE)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(path, json.load(f), storage)
+
+        state = cls(path, storage=storage)
+        latest = storage.latest_iso_date() if storage else None
+        if latest:
+            state.marks["reviews"] = latest
+        return state
+
+    # ==========================================
+    # KLJUČI
+    # ==========================================
+    def is_known(self, section, record):
+        """Zapis je že v bazi (iz prejšnjih zagonov)"""
+        return self.storage is not None and self.storage.contains(section, record)
+
+    def add(self, section, record):
+        """Označi zapis kot nov (pending); vrne False, če je že znan ali zapisan"""
+        if self.is_known(section, record):
+            return False
+        key = KEY_FUNCS[section](record)
+        with self._lock:
+            if key in self.pending[section]:
+                return False
+            self.pending[section].add(key)
+            return True
+
+    def resume(self, section, records):
+        """Zapisi prekinjenega zagona (iz sinka) so pending"""
+        with self._lock:
+            self.pending[section].update(KEY_FUNCS[section](r) for r in records)
+
+    def commit(self, section, records):
+        """Zapisi iz sinka so v bazi -> niso več pending"""
+        self.commit_records(section, records)
+        with self._lock:
+            self.pending[section] = set()
+
+    def commit_records(self, section, records):
+        """Posodobi high-water mark iz shranjenih zapisov"""
+        if section != "reviews":
+            return
+        for record in records:
+            date = record.get('date', '')
+            with self._lock:
+                if ISO_DATE.match(date) and date > self.marks.get("reviews", ""):
+                    self.marks["reviews"] = date
+
+    def reset(self, section, records):
+        """Po polnem zagonu: mark se izračuna samo iz novih zapisov sekcije"""
+        with self._lock:
+            self.pending[section] = set()
+            if section == "reviews":
+                self.marks.pop("reviews", None)
+        self.commit_records(section, records)
+
+    # ==========================================
+    # HIGH-WATER MARKI
+    # ==========================================
+    def set_mark(self, section, value):
+        with self._lock:
+            self.marks[section] = value
+
+    def get_mark(self, section, default=None):
+        return self.marks.get(section, default)
+
+    def is_older(self, section, date_str):
+        """Datum je starejši od najnovejšega znanega (samo za ISO datume)"""
+        mark = self.marks.get(section)
+        if not mark or not ISO_DATE.match(date_str or ''):
+            return False
+        return date_str < mark
+
+    # ==========================================
+    # SHRANJEVANJE
+    # ==========================================
+    def save(self):
+        """Atomarno zapiše stanje (tmp datoteka + os.replace)"""
+        with self._lock:
+            data = {"marks": dict(self.marks)}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
@@ -0,0 +1,410 @@
+import os
+import sqlite3
+import threading
+
+from parsers import parse_date, parse_price
+from sink import iter_json, write_json_array, write_csv
+from paths import section_file
+from state import SECTIONS
+
+DB_FILE = "scraped.sqlite"
+CHUNK = 500           # zapisov na executemany
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    price TEXT NOT NULL,
+    price_value REAL,
+    UNIQUE (name, price)
+);
+CREATE INDEX IF NOT EXISTS products_price ON products(price_value);
+
+CREATE TABLE IF NOT EXISTS reviews (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    date_parsed TEXT,
+    review_text TEXT NOT NULL,
+    rating INTEGER,
+    sentiment TEXT,
+    confidence REAL,
+    UNIQUE (date, review_text)
+);
+CREATE INDEX IF NOT EXISTS reviews_date ON reviews(date_parsed);
+CREATE INDEX IF NOT EXISTS reviews_rating ON reviews(rating);
+
+CREATE TABLE IF NOT EXISTS testimonials (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL UNIQUE,
+    rating INTEGER
+);
+CREATE INDEX IF NOT EXISTS testimonials_rating ON testimonials(rating);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Trigramski FTS indeks imen za iskanje podnizov (SQLite >= 3.34)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, content='products', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS products_ai AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts(rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS products_ad AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts(products_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+"""
+
+# Stolpci za .arrow/.parquet v vrstnem redu columnar.SCHEMAS (datum že kot ISO)
+COLUMNAR_SQL = {
+    "products": "SELECT name, price FROM products ORDER BY id",
+    "reviews": "SELECT date_parsed, review_text, rating, sentiment, confidence FROM reviews ORDER BY id",
+    "testimonials": "SELECT text, rating FROM testimonials ORDER BY id",
+}
+
+# Isti ključi kot KEY_FUNCS v state.py (product_key, review_key, testimonial_key):
+# konflikt v bazi = isti zapis za inkrementalno stanje
+UPSERTS = {
+    "products": (
+        "INSERT INTO products (name, price, price_value) VALUES (?, ?, ?) "
+        "ON CONFLICT (name, price) DO NOTHING"
+    ),
+    "reviews": (
+        "INSERT INTO reviews (date, date_parsed, review_text, rating, sentiment, confidence) "
+        "VALUES (?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (date, review_text) DO UPDATE SET rating = excluded.rating, "
+        "sentiment = COALESCE(excluded.sentiment, reviews.sentiment), "
+        "confidence = COALESCE(excluded.confidence, reviews.confidence)"
+    ),
+    "testimonials": (
+        "INSERT INTO testimonials (text, rating) VALUES (?, ?) "
+        "ON CONFLICT (text) DO UPDATE SET rating = excluded.rating"
+    ),
+}
+
+# Je zapis že v bazi - po istih UNIQUE indeksih (za ScrapeState)
+EXISTS = {
+    "products": "SELECT 1 FROM products WHERE name = ? AND price = ?",
+    "reviews": "SELECT 1 FROM reviews WHERE date = ? AND review_text = ?",
+    "testimonials": "SELECT 1 FROM testimonials WHERE text = ?",
+}
+
+
+def iso_date(date_str):
+    """Datum reviewa kot 'YYYY-MM-DD' (None, če ga ni mogoče prebrati)"""
+    parsed = parse_date(date_str)
+    return parsed.strftime('%Y-%m-%d') if parsed else None
+
+
+def iso_dates(values):
+    """Paket datumov -> ISO; vektorsko s pyarrow, sicer po vrsticah"""
+    try:
+        from columnar import parse_dates
+    except ImportError:
+        return [iso_date(value) for value in values]
+    return parse_dates(values)
+
+
+def key_row(section, record):
+    """Vrednosti unikatnega ključa zapisa v vrstnem redu EXISTS[section]"""
+    if section == "products":
+        return (record['name'], record['price'])
+    if section == "reviews":
+        return (record['date'], record['review_text'])
+    return (record['text'],)
+
+
+def to_rows(section, records):
+    """Paket zapisov scraperja -> vrstice za UPSERTS[section]"""
+    if section == "products":
+        return [(r['name'], r['price'], parse_price(r['price'])) for r in records]
+    if section == "reviews":
+        # Datumi celega paketa v enem prehodu (format se izbere enkrat)
+        dates = iso_dates([r['date'] for r in records])
+        return [
+            (r['date'], date, r['review_text'], r.get('rating'), r.get('AI Sentiment'), r.get('AI Confidence'))
+            for r, date in zip(records, dates)
+        ]
+    return [(r['text'], r.get('rating')) for r in records]
+
+
+def chunks(records, size=CHUNK):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class Storage:
+    """SQLite baza scraped podatkov z indeksi in unikatnimi ključi.
+
+    Scraper vanjo piše z bulk upserti, JSON/CSV pogledi se izvozijo iz nje,
+    dashboard pa bere samo vrstice, ki ustrezajo filtru.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        try:
+            self._db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite brez FTS5/trigram - iskanje z LIKE
+            self.fts = False
+        self._db.commit()
+
+    @classmethod
+    def open(cls, data_folder):
+        """Odpre bazo v mapi s podatki (spremenjene poglede uvozi sync_views())"""
+        return cls(os.path.join(data_folder, DB_FILE))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    # ==========================================
+    # PISANJE
+    # ==========================================
+    def upsert(self, section, records, replace=False):
+        """Bulk upsert zapisov (z replace najprej izprazni sekcijo); vrne št. novih vrstic"""
+        table = section
+        with self._lock, self._db:
+            if replace:
+                self._db.execute(f"DELETE FROM {table}")
+            before = self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for chunk in chunks(records):
+                self._db.executemany(UPSERTS[section], to_rows(section, chunk))
+            after = self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return after - before
+
+    def contains(self, section, record):
+        """Zapis je že v bazi (ena poizvedba po UNIQUE indeksu sekcije)"""
+        with self._lock:
+            return self._db.execute(EXISTS[section], key_row(section, record)).fetchone() is not None
+
+    def latest_iso_date(self):
+        """Najnovejši datum reviewa, ki ga je stran že dala v ISO obliki (ali None)"""
+        return self.scalar(
+            "SELECT MAX(date) FROM reviews WHERE date GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]'"
+        )
+
+    def iter_records(self, section):
+        """Zapisi sekcije v vrstnem redu vnosa, v obliki kot JSON pogledi (po kosih)"""
+        if section == "products":
+            rows = self.iter_rows("SELECT name, price FROM products ORDER BY id")
+            return ({"name": name, "price": price} for name, price in rows)
+        if section == "reviews":
+            # AI stolpci samo, če je reviews že obdelal sentiment.py
+            labelled = self.scalar("SELECT EXISTS (SELECT 1 FROM reviews WHERE sentiment IS NOT NULL)")
+            rows = self.iter_rows("SELECT date, review_text, rating, sentiment, confidence FROM reviews ORDER BY id")
+            return (
+                {"date": d, "review_text": t, "rating": r,
+                 **({"AI Sentiment": s, "AI Confidence": c} if labelled else {})}
+                for d, t, r, s, c in rows
+            )
+        rows = self.iter_rows("SELECT text, rating FROM testimonials ORDER BY id")
+        return ({"text": text, "rating": rating} for text, rating in rows)
+
+    def iter_rows(self, sql, params=(), batch=CHUNK * 10):
+        """Vrstice poizvedbe po kosih - brez seznama cele sekcije v pomnilniku"""
+        # Ločena povezava: WAL dovoli branje, medtem ko druge seje uporabljajo glavno
+        db = sqlite3.connect(self.path)
+        try:
+            cursor = db.execute(sql, params)
+            rows = cursor.fetchmany(batch)
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany(batch)
+        finally:
+            db.close()
+
+    # ==========================================
+    # JSON/CSV POGLEDI
+    # ==========================================
+    def _view_mtime(self, data_folder, section):
+        path = section_file(data_folder, section, 'json')
+        return str(os.path.getmtime(path)) if os.path.exists(path) else None
+
+    def _set_meta(self, key, value):
+        with self._lock, self._db:
+            self._db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def export_views(self, data_folder, section):
+        """Iz baze zapiše {section}.json in .csv za dashboard in obstoječa orodja"""
+        write_json_array(os.path.join(data_folder, f'{section}.json'), self.iter_records(section))
+        write_csv(os.path.join(data_folder, f'{section}.csv'), self.iter_records(section))
+        self._set_meta(f"view:{section}", self._view_mtime(data_folder, section))
+        return self.scalar(f"SELECT COUNT(*) FROM {section}")
+
+    def export_columnar(self, data_folder, section):
+        """Tipizirana {section}.arrow/.parquet iz baze (po paketih); None, če pyarrow ni nameščen"""
+        try:
+            from columnar import write_columnar
+        except ImportError:
+            return None
+        return write_columnar(data_folder, section, self.iter_rows(COLUMNAR_SQL[section]))
+
+    def sync_views(self, data_folder):
+        """Uvozi JSON poglede, ki so se spremenili mimo baze (npr. python sentiment.py).
+
+        Vrne {sekcija: število vrstic} za uvožene sekcije.
+        """
+        imported = {}
+        for section in SECTIONS:
+            mtime = self._view_mtime(data_folder, section)
+            if mtime is None or mtime == self._get_meta(f"view:{section}"):
+                continue
+            rows = self.upsert(section, iter_json(section_file(data_folder, section, 'json')), replace=True)
+            self._set_meta(f"view:{section}", mtime)
+            imported[section] = rows
+        return imported
+
+    # ==========================================
+    # POIZVEDBE ZA DASHBOARD
+    # ==========================================
+    def query(self, sql, params=()):
+        """Rezultat poizvedbe kot DataFrame (samo ustrezne vrstice)"""
+        import pandas as pd
+        with self._lock:
+            return pd.read_sql_query(sql, self._db, params=params)
+
+    def scalar(self, sql, params=()):
+        with self._lock:
+            return self._db.execute(sql, params).fetchone()[0]
+
+    def counts(self):
+        return {section: self.scalar(f"SELECT COUNT(*) FROM {section}") for section in SECTIONS}
+
+    # --- Products ---
+    def price_range(self):
+        with self._lock:
+            low, high = self._db.execute("SELECT MIN(price_value), MAX(price_value) FROM products").fetchone()
+        return None if low is None else (low, high)
+
+    def search_products(self, query='', min_price=None, max_price=None, limit=None):
+        """Produkti po imenu (podniz, vse besede) in ceni; FTS rangira po ujemanju"""
+        terms = [t for t in query.lower().split() if t]
+        where, params = [], []
+        # Trigram FTS rabi vsaj 3 znake; krajše besede z LIKE
+        fts_terms = [t for t in terms if self.fts and len(t) >= 3]
+        for term in terms:
+            if term not in fts_terms:
+                where.append("p.name LIKE ? ESCAPE '\\'")
+                params.append('%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        if min_price is not None:
+            where.append("p.price_value >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            where.append("p.price_value <= ?")
+            params.append(max_price)
+
+        if fts_terms:
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in fts_terms)
+            sql = ("SELECT p.name, p.price FROM products_fts f JOIN products p ON p.id = f.rowid "
+                   "WHERE products_fts MATCH ?" + "".join(f" AND {w}" for w in where) + " ORDER BY f.rank")
+            params.insert(0, match)
+        else:
+            sql = "SELECT p.name, p.price FROM products p" + (" WHERE " + " AND ".join(where) if where else "")
+            sql += " ORDER BY p.id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.query(sql, params)
+
+    # --- Testimonials ---
+    def testimonial_ratings(self):
+        with self._lock:
+            return [r for (r,) in self._db.execute("SELECT DISTINCT rating FROM testimonials ORDER BY rating")]
+
+    def testimonials_page(self, ratings, limit, offset=0):
+        """Ena stran testimonialov z izbranimi ocenami"""
+        marks = ",".join("?" * len(ratings))
+        return self.query(
+            f"SELECT id, text, rating FROM testimonials WHERE rating IN ({marks}) ORDER BY id LIMIT ? OFFSET ?",
+            [*ratings, int(limit), int(offset)]
+        )
+
+    def rating_histogram(self, section, ratings=None):
+        """{ocena: število} (z indeksom na rating)"""
+        sql = f"SELECT rating, COUNT(*) FROM {section}"
+        params = list(ratings or [])
+        if ratings is not None:
+            sql += f" WHERE rating IN ({','.join('?' * len(params))})"
+        with self._lock:
+            return dict(self._db.execute(sql + " GROUP BY rating ORDER BY rating", params).fetchall())
+
+    # --- Reviews ---
+    def review_months(self):
+        """Meseci s podatki kot (leto, mesec)"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT DISTINCT substr(date_parsed, 1, 7) FROM reviews WHERE date_parsed IS NOT NULL ORDER BY 1"
+            ).fetchall()
+        return [(int(m[:4]), int(m[5:7])) for (m,) in rows]
+
+    def date_bounds(self):
+        with self._lock:
+            return self._db.execute("SELECT MIN(date_parsed), MAX(date_parsed) FROM reviews").fetchone()
+
+    def unparsed_dates(self):
+        return self.scalar("SELECT COUNT(*) FROM reviews WHERE date_parsed IS NULL")
+
+    def reviews_between(self, start, end):
+        """Reviews z datumom v [start, end) - po indeksu reviews_date"""
+        df = self.query(
+            "SELECT date, review_text, rating, sentiment AS 'AI Sentiment', confidence AS 'AI Confidence', "
+            "date_parsed FROM reviews WHERE date_parsed >= ? AND date_parsed < ? ORDER BY date_parsed",
+            (f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}")
+        )
+        import pandas as pd
+        from loader import add_month_columns, compact_ratings
+
+        # Isti kompaktni tipi kot load_data (int8 ocena, Int8/Int16 mesec/leto, kategoričen mesec)
+        df['date_parsed'] = pd.to_datetime(df['date_parsed'], format='%Y-%m-%d')
+        df['AI Confidence'] = df['AI Confidence'].astype('float32')
+        return add_month_columns(compact_ratings(df))
+
+    def sentiment_summary(self, start, end):
+        """Število in vsota zaupanja po oznaki v [start, end)"""
+        return self.query(
+            "SELECT sentiment AS 'AI Sentiment', COUNT(*) AS Count, SUM(confidence) AS Confidence_Sum "
+            "FROM reviews WHERE date_parsed >= ? AND date_parsed < ? AND sentiment IS NOT NULL "
+            "GROUP BY sentiment",
+            (f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}")
+        ).set_index('AI Sentiment')
+
+    def monthly_summary(self, start, end):
+        """Število mnenj in povprečna ocena po mesecih v [start, end)"""
+        df = self.query(
+            "SELECT CAST(substr(date_parsed, 1, 4) AS INTEGER) AS year, "
+            "CAST(substr(date_parsed, 6, 2) AS INTEGER) AS month, COUNT(*) AS Count, AVG(rating) AS Avg_Rating "
+            "FROM reviews WHERE date_parsed >= ? AND date_parsed < ? GROUP BY 1, 2 ORDER BY 1, 2",
+            (f"{start:%Y-%m-%d}", f"{end:%Y-%m-%d}")
+        )
+        from rollups import month_label
+        df['Month'] = [month_label(y, m) for y, m in zip(df['year'], df['month'])]
+        return df
+
+    def iter_review_texts(self):
+        """((leto, mesec), besedilo) za vse reviews z datumom - po kosih, brez DataFrame"""
+        rows = self.iter_rows(
+            "SELECT substr(date_parsed, 1, 7), review_text FROM reviews WHERE date_parsed IS NOT NULL"
+        )
+        for month, text in rows:
+            yield (int(month[:4]), int(month[5:7])), text
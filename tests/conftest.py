@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Moduli so v korenu repozitorija (brez paketa)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
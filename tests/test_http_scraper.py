@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip("aiohttp")
+pytest.importorskip("lxml")
+
+from http_scraper import recorded_filename, scrape_product_pages, serve_recorded_pages
+from parsers import merge_product_pages
+
+
+def product(name, price):
+    return {"name": name, "price": price}
+
+
+def write_page(folder, page, products):
+    items = "".join(
+        f'<div class="product"><h3><a href="#">{p["name"]}</a></h3><div class="price">{p["price"]}</div></div>'
+        for p in products
+    )
+    page_html = f"<html><body><div class='catalog'>{items}</div></body></html>"
+    (folder / recorded_filename('/products', f'page={page}')).write_text(page_html, encoding='utf-8')
+
+
+@pytest.fixture
+def pages(tmp_path):
+    """Zapiše {stran: [produkti]} v tmp_path in jih streže lokalno; vrne base_url"""
+    server = None
+
+    def serve(pages_data):
+        nonlocal server
+        for page, products in pages_data.items():
+            write_page(tmp_path, page, products)
+        server, base_url = serve_recorded_pages(str(tmp_path))
+        return base_url
+
+    yield serve
+    if server:
+        server.shutdown()
+        server.server_close()
+
+
+# ==========================================
+# STRANI PRODUKTOV PREK STUB STREŽNIKA
+# ==========================================
+def test_stops_at_first_empty_page(pages):
+    first = [product("Box of Chocolate Candy", "$24.99"), product("Dark Red Energy Potion", "$4.99")]
+    second = [product("Teal Energy Potion", "$4.99")]
+    base_url = pages({1: first, 2: second, 3: []})
+
+    pages_data = scrape_product_pages(base_url, max_pages=10, concurrency=2)
+
+    assert pages_data == {1: first, 2: second, 3: []}
+    assert merge_product_pages(pages_data) == first + second
+
+
+def test_missing_page_counts_as_empty(pages):
+    first = [product("Box of Chocolate Candy", "$24.99")]
+    base_url = pages({1: first})
+
+    pages_data = scrape_product_pages(base_url, max_pages=10, concurrency=3)
+
+    assert pages_data == {1: first, 2: []}
+    assert merge_product_pages(pages_data) == first
+
+
+def test_stops_at_page_without_new_products(pages):
+    first = [product("Box of Chocolate Candy", "$24.99"), product("Dark Red Energy Potion", "$4.99")]
+    later = [product("Teal Energy Potion", "$4.99")]
+    # Stran 2 ponovi stran 1 (kot zadnja stran na strani) - stran 3 se ne šteje več
+    base_url = pages({1: first, 2: first, 3: later})
+
+    pages_data = scrape_product_pages(base_url, max_pages=10, concurrency=5)
+
+    assert 3 not in pages_data
+    assert merge_product_pages(pages_data) == first
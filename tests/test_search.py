@@ -0,0 +1,90 @@
+import pytest
+
+from storage import Storage
+
+PRODUCTS = [
+    {"name": "Box of Chocolate Candy", "price": "$24.99"},
+    {"name": "Dark Red Energy Potion", "price": "$4.99"},
+    {"name": "Potions Pack", "price": "$14.99"},
+    {"name": "Superpotion", "price": "$9.99"},
+    {"name": "Chocolate 100g", "price": "$3.99"},
+    {"name": "red_potion sample", "price": "$1.99"},
+    {"name": "Mystery Box", "price": "n/a"},
+]
+
+
+def names(ids):
+    return [PRODUCTS[i]["name"] for i in ids]
+
+
+# ==========================================
+# PRODUCTINDEX (V POMNILNIKU)
+# ==========================================
+@pytest.fixture
+def index():
+    pytest.importorskip("numpy")
+    from search import ProductIndex
+    return ProductIndex([p["name"] for p in PRODUCTS], [p["price"] for p in PRODUCTS])
+
+
+def test_exact_word_ranks_before_prefix_and_substring(index):
+    # potion (cela beseda) > potions (predpona) > superpotion (podniz); enake točke -> krajše ime
+    assert names(index.search("potion")) == [
+        "Dark Red Energy Potion", "Potions Pack", "Superpotion", "red_potion sample",
+    ]
+
+
+def test_prefix_substring_and_typo_matches(index):
+    assert names(index.search("choc")) == ["Chocolate 100g", "Box of Chocolate Candy"]
+    assert names(index.search("olat")) == ["Chocolate 100g", "Box of Chocolate Candy"]
+    assert names(index.search("chocolte")) == ["Chocolate 100g", "Box of Chocolate Candy"]
+
+
+def test_every_query_word_must_match(index):
+    assert names(index.search("energy potion")) == ["Dark Red Energy Potion"]
+    assert index.search("energy candy") == []
+
+
+def test_price_filter_skips_products_without_price(index):
+    assert names(index.search("", min_price=4, max_price=15)) == [
+        "Dark Red Energy Potion", "Potions Pack", "Superpotion",
+    ]
+    assert "Mystery Box" in names(index.search("box"))
+    assert names(index.search("box", min_price=0)) == ["Box of Chocolate Candy"]
+
+
+# ==========================================
+# STORAGE.SEARCH_PRODUCTS (FTS IN LIKE)
+# ==========================================
+@pytest.fixture(params=[True, False], ids=["fts", "like"])
+def storage(request, tmp_path):
+    pytest.importorskip("pandas")
+    db = Storage.open(str(tmp_path))
+    db.upsert("products", PRODUCTS)
+    # Brez FTS5/trigram gre vsaka beseda prek LIKE
+    db.fts = db.fts and request.param
+    yield db
+    db.close()
+
+
+def found(storage, query, **filters):
+    return storage.search_products(query, **filters)["name"].tolist()
+
+
+def test_search_products_price_filter(storage):
+    assert sorted(found(storage, "potion", max_price=10)) == [
+        "Dark Red Energy Potion", "Superpotion", "red_potion sample",
+    ]
+    assert found(storage, "", min_price=20) == ["Box of Chocolate Candy"]
+
+
+def test_search_products_escapes_like_wildcards(storage):
+    # % in _ sta navadna znaka, ne nadomestna
+    assert found(storage, "%") == []
+    assert found(storage, "_") == ["red_potion sample"]
+    assert found(storage, "d_p") == ["red_potion sample"]
+
+
+@pytest.mark.parametrize("query", ["100%", '"x', '"'])
+def test_search_products_special_characters_find_nothing(storage, query):
+    assert found(storage, query) == []
@@ -0,0 +1,130 @@
+import json
+
+import pytest
+
+from sink import RecordSink
+from state import ScrapeState, STATE_FILE
+from storage import Storage
+
+
+def review(text, date, rating=5):
+    return {"date": date, "review_text": text, "rating": rating}
+
+
+@pytest.fixture
+def storage(tmp_path):
+    db = Storage.open(str(tmp_path))
+    yield db
+    db.close()
+
+
+# ==========================================
+# NADALJEVANJE PREKINJENEGA ZAGONA
+# ==========================================
+def test_resume_skips_truncated_line_and_appends_on_new_line(tmp_path):
+    sink = RecordSink(str(tmp_path))
+    sink.write("reviews", review("First review text", "2023-06-01"))
+    sink.write("reviews", review("Second review text", "2023-06-02"))
+    sink.close()
+    # Crash med pisanjem: zadnja vrstica je nepopolna
+    with open(sink.path("reviews"), 'a', encoding='utf-8') as f:
+        f.write('{"date": "2023-06-03", "review_te')
+
+    resumed = RecordSink(str(tmp_path), resume=True)
+    assert resumed.count("reviews") == 2
+    resumed.write("reviews", review("Third review text", "2023-06-03"))
+    resumed.close()
+
+    texts = [r["review_text"] for r in resumed.iter_records("reviews")]
+    assert texts == ["First review text", "Second review text", "Third review text"]
+
+
+def test_without_resume_previous_records_are_dropped(tmp_path):
+    sink = RecordSink(str(tmp_path))
+    sink.write("reviews", review("First review text", "2023-06-01"))
+    sink.close()
+
+    fresh = RecordSink(str(tmp_path))
+    assert fresh.count("reviews") == 0
+    assert list(fresh.iter_records("reviews")) == []
+
+
+def test_resumed_records_are_pending_until_commit(tmp_path, storage):
+    sink = RecordSink(str(tmp_path))
+    sink.write("reviews", review("First review text", "2023-06-01"))
+    sink.close()
+
+    state = ScrapeState.load(str(tmp_path), storage)
+    state.resume("reviews", sink.iter_records("reviews"))
+    # Že zapisan v prekinjenem zagonu: ne emitira se znova, a še ni znan
+    assert not state.add("reviews", review("First review text", "2023-06-01"))
+    assert not state.is_known("reviews", review("First review text", "2023-06-01"))
+
+    storage.upsert("reviews", sink.iter_records("reviews"))
+    state.commit("reviews", sink.iter_records("reviews"))
+    state.save()
+    loaded = ScrapeState.load(str(tmp_path), storage)
+    assert loaded.is_known("reviews", review("First review text", "2023-06-01"))
+    assert loaded.get_mark("reviews") == "2023-06-01"
+    assert loaded.pending["reviews"] == set()
+
+
+def test_state_file_keeps_only_marks(tmp_path, storage):
+    state = ScrapeState.load(str(tmp_path), storage)
+    assert state.add("reviews", review("New review text", "2023-06-01"))
+    storage.upsert("reviews", [review("New review text", "2023-06-01")])
+    state.commit("reviews", [review("New review text", "2023-06-01")])
+    state.save()
+
+    with open(tmp_path / STATE_FILE, 'r', encoding='utf-8') as f:
+        assert json.load(f) == {"marks": {"reviews": "2023-06-01"}}
+    # Znan je, ker je v bazi, ne zaradi ključa v stanju
+    assert ScrapeState.load(str(tmp_path), storage).is_known("reviews", review("New review text", "2023-06-01"))
+
+
+# ==========================================
+# USTAVITEV PRI ZNANIH REVIEWIH
+# ==========================================
+def test_stop_at_known_review(tmp_path, storage):
+    state = ScrapeState(str(tmp_path / STATE_FILE), storage=storage)
+    storage.upsert("reviews", [review("Known review text", "2023-06-10")])
+    state.commit("reviews", [review("Known review text", "2023-06-10")])
+
+    assert state.is_known("reviews", review("Known review text", "2023-06-10"))
+    # Isti začetek besedila, drugo besedilo - ni isti review
+    assert not state.is_known("reviews", review("Known review text, but longer", "2023-06-10"))
+    assert state.is_older("reviews", "2023-06-09")
+    assert not state.is_older("reviews", "2023-06-10")
+    assert not state.is_older("reviews", "2023-06-11")
+
+
+def test_high_water_mark_uses_iso_dates_only(tmp_path):
+    state = ScrapeState(str(tmp_path / STATE_FILE))
+    state.commit("reviews", [review("Spelled out date", "June 20, 2023"), review("Iso date", "2023-06-10")])
+
+    assert state.get_mark("reviews") == "2023-06-10"
+    # Neiso datumov ne primerjamo leksikografsko
+    assert not state.is_older("reviews", "January 01, 2020")
+
+
+def test_reset_replaces_known_records_and_mark(tmp_path, storage):
+    state = ScrapeState(str(tmp_path / STATE_FILE), storage=storage)
+    storage.upsert("reviews", [review("Old review text", "2023-06-10")])
+    state.commit("reviews", [review("Old review text", "2023-06-10")])
+    # Polni zagon zamenja sekcijo v bazi, nato ponastavi stanje
+    storage.upsert("reviews", [review("New review text", "2023-05-01")], replace=True)
+    state.reset("reviews", [review("New review text", "2023-05-01")])
+
+    assert not state.is_known("reviews", review("Old review text", "2023-06-10"))
+    assert state.is_known("reviews", review("New review text", "2023-05-01"))
+    assert state.get_mark("reviews") == "2023-05-01"
+
+
+def test_first_load_takes_known_records_from_imported_views(tmp_path, storage):
+    with open(tmp_path / "reviews.json", 'w', encoding='utf-8') as f:
+        json.dump([review("Review from an older run", "2023-06-10")], f)
+    storage.sync_views(str(tmp_path))
+
+    state = ScrapeState.load(str(tmp_path), storage)
+    assert state.is_known("reviews", review("Review from an older run", "2023-06-10"))
+    assert state.get_mark("reviews") == "2023-06-10"
@@ -0,0 +1,115 @@
+import time
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+# Časovne omejitve (sekunde) po korakih
+STEP_TIMEOUTS = {
+    "page_load": 15,
+    "load_more": 10,
+    "scroll": 5,
+    "network_idle": 10,
+}
+POLL_FREQUENCY = 0.1
+
+COUNT_JS = "return document.querySelectorAll(arguments[0]).length"
+HEIGHT_JS = "return document.body.scrollHeight"
+RESOURCES_JS = "return [document.readyState, performance.getEntriesByType('resource').length]"
+
+
+class Waiter:
+    """Čaka na pogoje namesto fiksnih sleepov in beleži, koliko je čakal"""
+
+    def __init__(self, driver, timeouts=None, metrics=None):
+        self.driver = driver
+        self.timeouts = {**STEP_TIMEOUTS, **(timeouts or {})}
+        self.timings = []
+        self.metrics = metrics
+
+    def until(self, step, condition, timeout=None):
+        """Počaka, da condition(driver) vrne resnično vrednost; ob timeoutu vrne None"""
+        timeout = timeout or self.timeouts.get(step, STEP_TIMEOUTS["page_load"])
+        start = time.perf_counter()
+        try:
+            result = WebDriverWait(self.driver, timeout, poll_frequency=POLL_FREQUENCY).until(condition)
+            ok = True
+        except TimeoutException:
+            result, ok = None, False
+        seconds = time.perf_counter() - start
+        self.timings.append({
+            "step": step,
+            "seconds": round(seconds, 3),
+            "ok": ok
+        })
+        if self.metrics:
+            self.metrics.observe("wait_seconds", seconds, step=step)
+            if not ok:
+                self.metrics.inc("wait_timeouts_total", step=step)
+        return result
+
+    # ==========================================
+    # POGOJI
+    # ==========================================
+    def count(self, selector):
+        """Trenutno število elementov"""
+        return self.driver.execute_script(COUNT_JS, selector)
+
+    def height(self):
+        """Trenutna višina strani"""
+        return self.driver.execute_script(HEIGHT_JS)
+
+    def for_elements(self, step, selector):
+        """Vsaj en element je na strani"""
+        return self.until(step, lambda d: d.execute_script(COUNT_JS, selector) > 0)
+
+    def for_count_growth(self, step, selector, previous):
+        """Število elementov je večje od previous"""
+        return self.until(step, lambda d: d.execute_script(COUNT_JS, selector) > previous)
+
+    def for_height_change(self, step, previous):
+        """Višina strani se je spremenila (po scrollu)"""
+        return self.until(step, lambda d: d.execute_script(HEIGHT_JS) != previous)
+
+    def for_visible(self, step, locator):
+        """Element je viden - vrne element"""
+        return self.until(step, EC.visibility_of_element_located(locator))
+
+    def for_staleness(self, step, element):
+        """Element je izginil iz DOM-a"""
+        return self.until(step, EC.staleness_of(element))
+
+    def for_network_idle(self, step="network_idle", idle=0.5):
+        """Stran je naložena in `idle` sekund ni novih zahtevkov"""
+        state = {"count": -1, "since": time.perf_counter()}
+
+        def idle_condition(driver):
+            ready, count = driver.execute_script(RESOURCES_JS)
+            now = time.perf_counter()
+            if count != state["count"]:
+                state["count"], state["since"] = count, now
+                return False
+            return ready == "complete" and now - state["since"] >= idle
+
+        return self.until(step, idle_condition)
+
+    # ==========================================
+    # POROČILO
+    # ==========================================
+    def report(self):
+        """Izpiše skupni čas čakanja po korakih"""
+        report_timings(self.timings)
+
+
+def report_timings(timings):
+    """Izpiše skupni čas čakanja po korakih (tudi za več Waiterjev skupaj)"""
+    if not timings:
+        return
+    print("\n⏳ ČAKANJA")
+    steps = {}
+    for t in timings:
+        s = steps.setdefault(t["step"], {"count": 0, "seconds": 0.0, "timeouts": 0})
+        s["count"] += 1
+        s["seconds"] += t["seconds"]
+        s["timeouts"] += 0 if t["ok"] else 1
+    for step, s in steps.items():
+        print(f"   {step:<14} {s['count']:>4}x | {s['seconds']:6.2f}s | timeouti: {s['timeouts']}")
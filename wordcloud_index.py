@@ -0,0 +1,106 @@
+import io
+import re
+import threading
+from collections import Counter, OrderedDict
+
+TOKEN_RE = re.compile(r"\w[\w']+")
+# Enako kot wordcloud.STOPWORDS (brez uvoza wordclouda ob nalaganju)
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are aren't as at be because been before
+being below between both but by can can't cannot com could couldn't did didn't do does doesn't doing
+don't down during each else ever few for from further get had hadn't has hasn't have haven't having
+he he'd he'll he's hence her here here's hers herself him himself his how how's however http i i'd
+i'll i'm i've if in into is isn't it it's its itself just k let's like me more most mustn't my myself
+no nor not of off otherwise on once only or other ought our ours ourselves out over own r same shall
+shan't she she'd she'll she's should shouldn't since so some such than that that's the their theirs
+them themselves then there there's therefore these they they'd they'll they're they've this those
+through to too under until up very was wasn't we we'd we'll we're we've were weren't what what's
+when when's where where's which while who who's whom why why's with won't would wouldn't www you
+you'd you'll you're you've your yours yourself yourselves
+""".split())
+MAX_WORDS = 200
+CACHE_SIZE = 64       # PNG slik v pomnilniku
+
+
+def tokenize(text):
+    """Besede brez stop words in števil (podobno kot WordCloud.process_text)"""
+    tokens = []
+    for word in TOKEN_RE.findall(str(text).lower()):
+        if word.endswith("'s"):
+            word = word[:-2]
+        if len(word) > 1 and word not in STOPWORDS and not word.isdigit():
+            tokens.append(word)
+    return tokens
+
+
+class WordIndex:
+    """Frekvence besed po mesecih, zgrajene enkrat ob nalaganju.
+
+    Ključ je (leto, mesec); števci poljubnega obdobja se seštejejo,
+    zato word cloud ne tokenizira besedil ob vsakem rerunu.
+    """
+
+    def __init__(self, counters=None):
+        self.counters = counters or {}
+
+    @classmethod
+    def from_texts(cls, items):
+        """Iz zaporedja ((leto, mesec), besedilo) - npr. Storage.iter_review_texts()"""
+        counters = {}
+        for key, text in items:
+            counter = counters.get(key)
+            if counter is None:
+                counter = counters[key] = Counter()
+            counter.update(tokenize(text))
+        return cls(counters)
+
+    def months(self):
+        return sorted(self.counters)
+
+    def frequencies(self, start, end=None, max_words=MAX_WORDS):
+        """Združene frekvence za mesece od start do end (vključno), npr. (2023, 6)"""
+        end = end or start
+        total = Counter()
+        for key, counter in self.counters.items():
+            if start <= key <= end:
+                total.update(counter)
+        return dict(total.most_common(max_words))
+
+
+class WordCloudCache:
+    """Omejen LRU cache PNG slik, ključ je obdobje + parametri izrisa"""
+
+    def __init__(self, index, size=CACHE_SIZE):
+        self.index = index
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, start, end=None, width=800, height=400, background_color='white', max_words=MAX_WORDS):
+        """PNG (bytes) word clouda za obdobje; None, če v obdobju ni besed"""
+        key = (start, end or start, width, height, background_color, max_words)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return self._images[key]
+
+        frequencies = self.index.frequencies(start, end, max_words)
+        png = None
+        if frequencies:
+            # Uvoz šele tu - ostale strani ga ne rabijo
+            from wordcloud import WordCloud
+            wordcloud = WordCloud(width=width, height=height, background_color=background_color,
+                                  max_words=max_words).generate_from_frequencies(frequencies)
+            buffer = io.BytesIO()
+            wordcloud.to_image().save(buffer, format='PNG')
+            png = buffer.getvalue()
+
+        with self._lock:
+            self.misses += 1
+            self._images[key] = png
+            while len(self._images) > self.size:
+                self._images.popitem(last=False)
+        return png